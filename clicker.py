@@ -1,61 +1,264 @@
 # clicker.py
 
-import pyautogui
+import os
+import sys
+import atexit
 import random
 import time
 import logging
 
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from mouse_backend import position as _position, glide as _backend_glide, press as _press, release as _release
+from mouse_backend import SCREEN_SIZE
+
 logger = logging.getLogger(__name__)
 
+# Cursor updates per second while gliding to the target.
+MOVE_RATE = 120
+
+# Bezier control points land within this fraction of the glide distance of its midpoint.
+CURVE_SPREAD = 0.25
+
+# Each glide step's delay varies by up to +/- this fraction (the total is kept).
+STEP_JITTER = 0.3
+
+_SCREEN_W, _SCREEN_H = SCREEN_SIZE
+
+# Delay ranges in seconds, per profile:
+#   (glide_min, glide_max, pre_press_min, pre_press_max, hold_min, hold_max)
+# "instant" collapses the glide to a single jump, handy for tests.
+PROFILES = {
+    "human": (0.7, 1.5, 0.05, 0.2, 0.05, 0.2),
+    "fast": (0.05, 0.1, 0.01, 0.02, 0.01, 0.02),
+    "instant": (0, 0, 0, 0, 0, 0),
+}
+CLICK_PROFILE = os.getenv("CLICKER_PROFILE", "human")
+if CLICK_PROFILE not in PROFILES:
+    logger.warning("Unknown CLICKER_PROFILE '%s'; using 'human'.", CLICK_PROFILE)
+    CLICK_PROFILE = "human"
+PROFILE = PROFILES[CLICK_PROFILE]
+
+# time.sleep() is only trusted for the bulk of a wait; the last slice is spun out.
+SPIN_THRESHOLD = 0.002
+
+if sys.platform == "win32":
+    import ctypes
+
+    # Default Windows timer granularity is ~15.6ms, far coarser than our delays.
+    ctypes.windll.winmm.timeBeginPeriod(1)
+    atexit.register(ctypes.windll.winmm.timeEndPeriod, 1)
+
+# Private generators so clicks don't contend on the module-level random state.
+# Delay jitter only needs to look natural, so it is drawn in batches from NumPy's
+# PCG64; click coordinates are what a fingerprinting script could model, so
+# they come from the OS CSPRNG.
+_coord_rng = random.SystemRandom()
+_np_rng = np.random.default_rng()
+
+# There is only one OS cursor, so background clicks are serialised on one worker.
+_click_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clicker")
+
+
+def _precise_sleep(seconds: float, _now=time.perf_counter, _sleep=time.sleep):
+    """
+    Sleeps for 'seconds' with sub-millisecond accuracy: time.sleep() for the
+    bulk, then a perf_counter busy-wait for the final SPIN_THRESHOLD.
+    """
+    end = _now() + seconds
+    coarse = seconds - SPIN_THRESHOLD
+    if coarse > 0:
+        _sleep(coarse)
+    while _now() < end:
+        pass
+
+
 def hardware_click_range(top_right, bottom_left=None):
     """
-    OS-level click handler using PyAutoGUI.
+    OS-level click handler (see mouse_backend.py for the per-OS input layer).
 
     - If 'bottom_left' is None:
          We do an absolute click exactly at 'top_right'.
     - Otherwise:
          We interpret 'bottom_left' as the bottom-left corner of a box
          and 'top_right' as the top-right corner, picking a random point
-         in that rectangle for the click.
+         in that rectangle for the click. Swapped corners are tolerated.
 
     'top_right' is always a (x, y) tuple.
     'bottom_left' is either None or (x, y).
+
+    Malformed points raise TypeError; an off-screen target is logged and
+    returns False before the cursor moves. Input errors from the OS backend
+    are left for the caller to handle.
     """
 
-    try:
-        if bottom_left is None:
-            # Direct absolute click at top_right
-            return _perform_click(top_right[0], top_right[1], label="absolute_click")
-        else:
-            # Random click within the bounding box from bottom_left => top_right
-            x1, y1 = bottom_left
-            x2, y2 = top_right
-
-            # Ensure the coords are actually bottom-left vs top-right
-            # i.e. x1 <= x2, y1 <= y2. If your geometry is reversed, swap them or handle logic.
-            if x2 <= x1 or y2 <= y1:
-                logger.error("Invalid bounding box: top_right <= bottom_left in some dimension.")
-                return False
-
-            final_x = random.uniform(x1, x2)
-            final_y = random.uniform(y1, y2)
-            return _perform_click(final_x, final_y, label="range_click")
-
-    except Exception as e:
-        logger.warning("hardware_click_range failed: %s", e)
+    _check_point("top_right", top_right)
+    if bottom_left is None:
+        # Direct absolute click at top_right
+        x, y = top_right
+        label = "absolute_click"
+    else:
+        _check_point("bottom_left", bottom_left)
+
+        # Random click within the bounding box from bottom_left => top_right.
+        # min/max normalise it so swapped corners still describe the same box.
+        lo = np.asarray(bottom_left, dtype=np.float64)
+        hi = np.asarray(top_right, dtype=np.float64)
+        lo, hi = np.minimum(lo, hi), np.maximum(lo, hi)
+
+        x, y = (lo + (hi - lo) * (_coord_rng.random(), _coord_rng.random())).tolist()
+        label = "range_click"
+
+    if not _on_screen(x, y):
+        logger.error("[%s] Refusing off-screen click at (%.1f, %.1f).", label, x, y)
         return False
 
+    sleep = _precise_sleep
+    glide_lo, glide_hi, pre_lo, pre_hi, hold_lo, hold_hi = PROFILE
+    d_glide, d_pre, d_hold = _np_rng.random(3).tolist()
+    duration = glide_lo + (glide_hi - glide_lo) * d_glide
+    pre_press = pre_lo + (pre_hi - pre_lo) * d_pre
+    hold = hold_lo + (hold_hi - hold_lo) * d_hold
 
-def _perform_click(x: float, y: float, label="click"):
+    _move_smoothly(x, y, duration)
+    sleep(pre_press)
+    _press()
+    sleep(hold)
+    _release()
+
+    logger.debug("[%s] Clicked at screen coords (%.1f, %.1f)", label, x, y)
+    return True
+
+
+def hardware_click_range_async(top_right, bottom_left=None):
     """
-    Low-level OS click using PyAutoGUI with random delay and easing.
+    Same as hardware_click_range, but runs on a background worker and returns
+    a concurrent.futures.Future, so the caller can keep polling the page while
+    the cursor moves. Call .result() to wait for (and re-raise from) the click.
     """
-    duration = random.uniform(0.7, 1.5)
-    pyautogui.moveTo(x, y, duration=duration, tween=pyautogui.easeInOutQuad)
-    time.sleep(random.uniform(0.05, 0.2))
-    pyautogui.mouseDown()
-    time.sleep(random.uniform(0.05, 0.2))
-    pyautogui.mouseUp()
+    return _click_executor.submit(hardware_click_range, top_right, bottom_left)
+
+
+def hardware_click_many(points):
+    """
+    Clicks several targets one after another.
+
+    Each entry of 'points' is a (top_right, bottom_left) pair with the same
+    meaning as the arguments of hardware_click_range ('bottom_left' may be
+    None for an absolute click). Every target, glide path and delay is drawn
+    up front in one batch, so the execution loop only moves, sleeps and clicks.
+    """
+    n = len(points)
+    if not n:
+        return True
+
+    lo = np.empty((n, 2))
+    hi = np.empty((n, 2))
+    for i, (top_right, bottom_left) in enumerate(points):
+        _check_point("top_right", top_right)
+        if bottom_left is None:
+            bottom_left = top_right
+        else:
+            _check_point("bottom_left", bottom_left)
+        lo[i] = bottom_left
+        hi[i] = top_right
+    lo, hi = np.minimum(lo, hi), np.maximum(lo, hi)
+
+    coord_rand = _coord_rng.random
+    fractions = np.array([[coord_rand(), coord_rand()] for _ in range(n)])
+    targets = (lo + (hi - lo) * fractions).tolist()
+    for x, y in targets:
+        if not _on_screen(x, y):
+            logger.error("[batch_click] Refusing batch with off-screen click at (%.1f, %.1f).", x, y)
+            return False
+
+    # Columns: glide duration, pre-press delay, hold.
+    draws = _np_rng.random((n, 3))
+    glide_lo, glide_hi, pre_lo, pre_hi, hold_lo, hold_hi = PROFILE
+    durations = (glide_lo + (glide_hi - glide_lo) * draws[:, 0]).tolist()
+    pre_presses = (pre_lo + (pre_hi - pre_lo) * draws[:, 1]).tolist()
+    holds = (hold_lo + (hold_hi - hold_lo) * draws[:, 2]).tolist()
+
+    plan = []
+    x0, y0 = _position()
+    for (x, y), duration in zip(targets, durations):
+        steps = max(int(duration * MOVE_RATE), 1)
+        xs, ys = _move_path(x0, y0, x, y, steps)
+        plan.append((xs.tolist(), ys.tolist(), _step_delays(duration, steps)))
+        x0, y0 = x, y
+
+    for (xs, ys, delays), pre_press, hold, (x, y) in zip(plan, pre_presses, holds, targets):
+        _glide(xs, ys, delays)
+        _precise_sleep(pre_press)
+        _press()
+        _precise_sleep(hold)
+        _release()
+        logger.debug("[batch_click] Clicked at screen coords (%.1f, %.1f)", x, y)
 
-    logger.info(f"[{label}] Clicked at screen coords ({x:.1f}, {y:.1f})")
     return True
+
+
+def _on_screen(x: float, y: float) -> bool:
+    return 0 <= x < _SCREEN_W and 0 <= y < _SCREEN_H
+
+
+def _check_point(name: str, point):
+    """
+    Raises TypeError unless 'point' is an (x, y) tuple.
+    """
+    if not (isinstance(point, tuple) and len(point) == 2):
+        raise TypeError(f"{name} must be an (x, y) tuple, got {point!r}")
+
+
+def _move_path(x0: float, y0: float, x: float, y: float, steps: int):
+    """
+    Precomputes the whole cursor path from (x0, y0) to (x, y) as integer
+    screen coords. The path is a cubic Bezier with two random control points
+    near the midpoint, so repeated glides between the same points differ;
+    progress along it is eased with smoothstep (u*u*(3 - 2u)).
+    """
+    p0 = np.array((x0, y0), dtype=np.float64)
+    p3 = np.array((x, y), dtype=np.float64)
+    spread = max(float(np.hypot(*(p3 - p0))) * CURVE_SPREAD, 1.0)
+    mid = (p0 + p3) / 2.0
+    jitter = _coord_rng.uniform
+    p1 = mid + (jitter(-spread, spread), jitter(-spread, spread))
+    p2 = mid + (jitter(-spread, spread), jitter(-spread, spread))
+
+    t = np.linspace(0.0, 1.0, steps + 1)[1:]
+    u = (t * t * (3.0 - 2.0 * t))[:, None]
+    v = 1.0 - u
+    points = v ** 3 * p0 + 3.0 * v * v * u * p1 + 3.0 * v * u * u * p2 + u ** 3 * p3
+    points = np.rint(points).astype(np.int32)
+    return points[:, 0], points[:, 1]
+
+
+def _move_smoothly(x: float, y: float, duration: float):
+    """
+    Glides the cursor from its current position to (x, y) over 'duration' seconds.
+    """
+    x0, y0 = _position()
+    steps = max(int(duration * MOVE_RATE), 1)
+    xs, ys = _move_path(x0, y0, x, y, steps)
+    _glide(xs.tolist(), ys.tolist(), _step_delays(duration, steps))
+
+
+def _step_delays(duration: float, steps: int):
+    """
+    Splits 'duration' into 'steps' slightly uneven per-step delays, drawn in
+    one batch. Returns None for a zero-length glide (jump straight there).
+    """
+    if duration <= 0:
+        return None
+    weights = 1.0 + STEP_JITTER * (2.0 * _np_rng.random(steps) - 1.0)
+    return (weights * (duration / weights.sum())).tolist()
+
+
+def _glide(xs, ys, delays):
+    """
+    Walks the cursor through a precomputed path, sleeping delays[i] after
+    step i (or moving without pauses when delays is None).
+    """
+    _backend_glide(xs, ys, delays, _precise_sleep)
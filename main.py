@@ -1,30 +1,48 @@
 import os
+import re
+import json
 import time
+import shutil
+import calendar
+import tempfile
 import random
 import logging
 import traceback
 
 import undetected_chromedriver as uc
 
+from concurrent.futures import ThreadPoolExecutor
+
 from configparser import ConfigParser
 from datetime import datetime
 from datetime import timedelta
 from datetime import time as dtime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 
 # Import all our “utility” functions from util.py
 from util import (
     parse_config,
     random_sleep,
     capture_screenshot,
+    is_driver_alive,
     wait_for_internet_connection,
     check_firewall_and_queue,
     solve_captcha,
     is_time_between,
+    sleep_until_open,
     input_text_box,
+    type_into,
+    page_text_contains,
     scan_for_preferred_tests,
     book_test_flow,
     send_text_available,
@@ -43,8 +61,9 @@ logger = logging.getLogger(__name__)
 
 CURRENT_PATH = os.path.dirname(os.path.realpath(__file__))
 
+CONFIG_PATH = os.path.join(CURRENT_PATH, 'config.ini')
 CONFIG = ConfigParser()
-CONFIG.read(os.path.join(CURRENT_PATH, 'config.ini'))
+CONFIG.read(CONFIG_PATH)
 
 PHONE_NUMBER = CONFIG.get("twilio", "phone_number")
 CHROMEDRIVER_PATH = "/bin/chromedriver"
@@ -64,13 +83,77 @@ DVSA_QUEUE_URL = (
 )
 DVSA_APPLICATION_URL = "https://driverpracticaltest.dvsa.gov.uk/application"
 
+# Logged-in DVSA sessions (cookies + page URL) saved per centre, so a restart
+# can skip the queue, captcha and login while the session is still valid.
+SESSION_DIR = os.path.join(CURRENT_PATH, "sessions")
+
 DVSA_DELAY = 60
 MAX_ATTEMPTS = 4
 
+# Upper bound on centres searched at once (worker threads). Each centre's bot
+# keeps its own browser open between passes, so one Chrome per centre stays running.
+MAX_PARALLEL_BOTS = 3
+
+# Explicit waits: max seconds to wait for the next element, and how often to poll.
+WAIT_TIMEOUT = 10
+WAIT_POLL = 0.2
+
+# Queue polling backs off from QUEUE_POLL_MIN by QUEUE_POLL_FACTOR up to QUEUE_POLL_MAX seconds.
+QUEUE_POLL_MIN = 0.3
+QUEUE_POLL_MAX = 5.0
+QUEUE_POLL_FACTOR = 1.5
+
+# Seconds to back off when the firewall is still up after resolve_firewall() gave up.
+FIREWALL_COOLDOWN = 20
+
+# Calendar header month name -> month number, built once instead of strptime("%B") per lookup.
+MONTH_NUMBERS = {name: number for number, name in enumerate(calendar.month_name) if name}
+
+# SMS alerts go out on these workers so Twilio latency never delays a booking click.
+SMS_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="sms")
+
 BLOCK_IMAGES = False
+
+# Content the DVSA pages never need for automation (2 = block). JS stays on.
+CHROME_BLOCKED_CONTENT = {
+    "profile.managed_default_content_settings.fonts": 2,
+    "profile.managed_default_content_settings.plugins": 2,
+    "profile.managed_default_content_settings.popups": 2,
+    "profile.managed_default_content_settings.geolocation": 2,
+    "profile.managed_default_content_settings.media_stream": 2,
+    "profile.default_content_setting_values.notifications": 2,
+}
+
+# Background Chrome services that only add traffic and startup work.
+CHROME_ARGS = (
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-default-apps",
+    "--no-first-run",
+    "--disable-client-side-phishing-detection",
+    "--disable-features=Translate,OptimizationHints",
+)
+
+# Analytics, beacons and web fonts, null-routed through DevTools on every page.
+BLOCKED_URL_PATTERNS = [
+    "*googletagmanager.com*",
+    "*google-analytics.com*",
+    "*doubleclick.net*",
+    "*hotjar.com*",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*/analytics*",
+    "*/beacon*",
+]
+
 SOLVE_MANUALLY = False
 RUN_ON_VM = False
 
+# Set True to start Chrome headless; a bot then switches to a visible window
+# only once a captcha needs real mouse clicks. Ignored when Buster is enabled.
+HEADLESS = False
+
 DVSA_OPEN_TIME = dtime(6, 0, 30)
 DVSA_CLOSE_TIME = dtime(21, 35)
 
@@ -92,21 +175,54 @@ class DVSABot:
       2) (Reschedule flow) Login or pass the DVSA queue
       3) Search for earlier tests
       4) Optionally book
+
+    Each bot searches a single centre (preferences["center"][0]); the
+    reschedule flow runs one bot per preferred centre in parallel.
     """
 
+    __slots__ = (
+        "preferences", "driver", "wait", "active",
+        "_min_date", "_max_date", "_unavailable", "_current_test_date", "_fmt_current_date",
+        "headless", "_profile_dir", "_session_path",
+    )
+
     def __init__(self, preferences: dict):
         self.preferences = preferences
         self.driver = None
+        self.wait = None
         self.active = False
-        self.current_centre_index = 0
+        self.headless = HEADLESS and not BUSTER_ENABLED
+        self._profile_dir = None
+        # Fixed up front: earliest-test mode rewrites preferences["center"] in login().
+        self._session_path = self._session_file()
+        # Scan filters, read out of the preferences once rather than on every search.
+        self._min_date = preferences["min-date"]
+        self._max_date = preferences["max-date"]
+        self._unavailable = preferences.get("disabled-dates", frozenset())
+        self._current_test_date = preferences["current-test"]["date"]
+        self._fmt_current_date = FORMATTED_CURRENT_TEST_DATE
 
     def setup_driver(self):
         chrome_options = uc.ChromeOptions()
+        # Hand control back at DOMContentLoaded; explicit waits cover the rest.
+        chrome_options.page_load_strategy = "eager"
+
+        prefs = dict(CHROME_BLOCKED_CONTENT)
+        for arg in CHROME_ARGS:
+            chrome_options.add_argument(arg)
 
         # Optional: block images to speed things up
         if BLOCK_IMAGES:
-            prefs = {"profile.managed_default_content_settings.images": 2}
-            chrome_options.add_experimental_option("prefs", prefs)
+            prefs["profile.managed_default_content_settings.images"] = 2
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_experimental_option("prefs", prefs)
+
+        if self.headless:
+            chrome_options.add_argument("--window-size=1400,900")
+
+        # A throwaway profile per browser skips undetected-chromedriver's profile lock wait.
+        self._profile_dir = tempfile.mkdtemp(prefix="uc-")
+        chrome_options.add_argument(f"--user-data-dir={self._profile_dir}")
 
         # Optional: if you're on a VM or need stealthy headers
         if RUN_ON_VM:
@@ -133,11 +249,47 @@ class DVSABot:
             driver_executable_path=r"C:\chromedriver\chromedriver.exe",  # your local chromedriver
             options=chrome_options,
             use_subprocess=True,
-            patcher=False
+            patcher=False,
+            # uc's own headless mode also hides "HeadlessChrome" and navigator.webdriver.
+            headless=self.headless
         )
+        self.wait = WebDriverWait(self.driver, WAIT_TIMEOUT, poll_frequency=WAIT_POLL)
+
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        except WebDriverException as exc:
+            logger.warning("Could not block tracking URLs: %s", exc)
 
         logger.info("Driver initialized using local Chrome + chromedriver.")
 
+    def quit_driver(self):
+        """
+        Closes the browser (ignoring errors from a dead session) so the next
+        login() starts a fresh one.
+        """
+        if self.driver:
+            try:
+                self.driver.quit()
+            except:
+                pass
+        self.driver = None
+        self.wait = None
+        self.active = False
+        if self._profile_dir:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+            self._profile_dir = None
+
+    def relaunch_headed(self):
+        """
+        Captchas are solved with OS-level clicks, which need a visible window:
+        replaces a headless browser with a headed one. The caller navigates.
+        """
+        logger.info("Captcha needs a visible browser; relaunching Chrome headed.")
+        self.headless = False
+        self.quit_driver()
+        self.setup_driver()
+
     def enter_reschedule_credentials(self, manual: bool = False):
         """
         Enter licence and booking reference for the reschedule flow.
@@ -154,44 +306,43 @@ class DVSABot:
         input_text_box(self.driver, "driving-licence-number", licence_num)
         input_text_box(self.driver, "application-reference-number", booking_ref)
 
-        random_sleep(1, 1)
+        random_sleep(0.1, 0.2)
         try:
-            self.driver.find_element(By.ID, "booking-login").click()
-            random_sleep(3, 1)
-        except NoSuchElementException:
-            logger.error("Could not find 'booking-login' button.")
+            login_button = self.wait.until(EC.element_to_be_clickable((By.ID, "booking-login")))
+            login_button.click()
+            self.wait.until(EC.staleness_of(login_button))
+        except TimeoutException:
+            logger.error("Could not find 'booking-login' button, or the login page did not submit.")
         logger.info("Credentials entered.")
 
     def handle_queue_and_firewall(self):
-        """(Unchanged) handle queue & Imperva for the reschedule flow."""
+        """
+        Handle queue & Imperva for the reschedule flow. The queue is polled
+        with exponential backoff, so a short queue is noticed quickly.
+        """
         max_queue_checks = 100
         loop_count = 0
+        delay = QUEUE_POLL_MIN
 
         while loop_count < max_queue_checks:
             status = check_firewall_and_queue(self.driver)
             if status == "queue":
-                logger.info("DVSA queue active; waiting a bit. (loop_count=%d)", loop_count)
-                random_sleep(0.5, 1.5)
+                logger.info("DVSA queue active; next check in %.1fs. (loop_count=%d)", delay, loop_count)
+                time.sleep(delay)
+                delay = min(delay * QUEUE_POLL_FACTOR, QUEUE_POLL_MAX)
                 loop_count += 1
                 continue
+            delay = QUEUE_POLL_MIN
 
             if status == "firewall":
                 logger.warning("Imperva firewall encountered. Attempting fix.")
-                random_sleep(0.5, 2.5)
-                solved = solve_captcha(
-                    self.driver,
-                    skip=SOLVE_MANUALLY,
-                    coord_top_right=COORD_TOP_RIGHT,
-                    coord_bottom_left=COORD_BOTTOM_LEFT
-                )
-                if solved:
-                    time.sleep(3)
-                    if check_firewall_and_queue(self.driver) == "firewall":
-                        logger.warning("Still behind firewall after captcha. Extra delay 3min.")
-                        random_sleep(180, 10)
-                else:
-                    logger.warning("Captcha not solved; continuing attempts.")
-                self.driver.refresh()
+                if self.headless:
+                    self.relaunch_headed()
+                    self.driver.get(DVSA_QUEUE_URL)
+                    continue
+                if not self.resolve_firewall():
+                    logger.warning("Still behind firewall. Cooling down before retrying.")
+                    random_sleep(FIREWALL_COOLDOWN, 4)
 
             elif status == "login_required":
                 logger.info("Reached login page.")
@@ -207,12 +358,109 @@ class DVSABot:
             logger.error("Queue max time exceeded. Attempting fallback refresh.")
             self.driver.refresh()
 
+    def _wait_for_firewall_to_clear(self, timeout: float) -> bool:
+        """
+        Polls until the Imperva page is gone, for at most 'timeout' seconds.
+        Returns False if we are still behind the firewall.
+        """
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=WAIT_POLL).until(
+                lambda d: check_firewall_and_queue(d) != "firewall"
+            )
+            return True
+        except TimeoutException:
+            return False
+
+    def resolve_firewall(self, attempts: int = 3, base_delay: float = 3) -> bool:
+        """
+        Solves the Imperva captcha up to 'attempts' times. After each solve we
+        wait up to base_delay * 2**try seconds for the page to clear, and
+        refresh before trying again. Returns True once we are past the firewall.
+        """
+        for i in range(attempts):
+            if check_firewall_and_queue(self.driver) != "firewall":
+                return True
+            random_sleep(0.5, 1)
+            solved = solve_captcha(
+                self.driver,
+                skip=SOLVE_MANUALLY,
+                coord_top_right=COORD_TOP_RIGHT,
+                coord_bottom_left=COORD_BOTTOM_LEFT
+            )
+            if solved and self._wait_for_firewall_to_clear(base_delay * 2 ** i):
+                return True
+            if not solved:
+                logger.warning("Captcha not solved (try %d/%d).", i + 1, attempts)
+            self.driver.refresh()
+        return check_firewall_and_queue(self.driver) != "firewall"
+
+    def _session_file(self) -> str:
+        centre = self.preferences.get("center") or ["default"]
+        slug = re.sub(r"[^a-z0-9]+", "-", centre[0].lower()).strip("-")
+        return os.path.join(SESSION_DIR, f"{slug}.json")
+
+    def _save_session(self):
+        """
+        Stores the cookies and URL of a logged-in page for _restore_session().
+        """
+        os.makedirs(SESSION_DIR, exist_ok=True)
+        session = {"url": self.driver.current_url, "cookies": self.driver.get_cookies()}
+        # Live auth cookies: readable and writable by this user only.
+        fd = os.open(self._session_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(session, f)
+        os.chmod(self._session_path, 0o600)
+
+    def _drop_session(self):
+        try:
+            os.remove(self._session_path)
+        except FileNotFoundError:
+            pass
+
+    def _restore_session(self) -> bool:
+        """
+        Loads saved DVSA cookies and reopens the saved page. Returns True if that
+        lands us logged in; otherwise the saved session is deleted.
+        """
+        try:
+            with open(self._session_path) as f:
+                session = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        logger.info("Trying saved DVSA session.")
+        # Set through CDP, which needs no DVSA page open first: while the queue
+        # is active, opening one lands on the queue domain and the cookies are lost.
+        for cookie in session["cookies"]:
+            params = {k: cookie[k] for k in ("name", "value", "domain", "path", "secure", "httpOnly") if k in cookie}
+            if "expiry" in cookie:
+                params["expires"] = cookie["expiry"]
+            if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+                params["sameSite"] = cookie["sameSite"]
+            try:
+                self.driver.execute_cdp_cmd("Network.setCookie", params)
+            except WebDriverException:
+                pass
+        self.driver.get(session["url"])
+
+        status = check_firewall_and_queue(self.driver)
+        if status == "ok" and "loginError=true" not in self.driver.current_url:
+            logger.info("Saved session still valid; skipping queue and login.")
+            self.active = True
+            return True
+
+        logger.info("Saved session rejected ('%s'); doing a full login.", status)
+        self._drop_session()
+        return False
+
     def login(self):
         """
         The login step for the *reschedule* flow.
         """
         if not self.driver:
             self.setup_driver()
+        if self._restore_session():
+            return
 
         logger.info("Navigating to DVSA queue URL: %s", DVSA_QUEUE_URL)
         self.driver.get(DVSA_QUEUE_URL)
@@ -227,25 +475,17 @@ class DVSABot:
         status = check_firewall_and_queue(self.driver)
         if status == "firewall":
             logger.warning("Firewall triggered after login attempt.")
-            random_sleep(2, 5)
-            solved = solve_captcha(
-                self.driver,
-                skip=SOLVE_MANUALLY,
-                coord_top_right=COORD_TOP_RIGHT,
-                coord_bottom_left=COORD_BOTTOM_LEFT
-            )
-            if solved:
-                time.sleep(3)
-                status = check_firewall_and_queue(self.driver)
-                if status == "firewall":
-                    logger.warning("Still behind firewall. 20s delay.")
-                    random_sleep(20, 4)
-            else:
-                logger.warning("Captcha not solved on second attempt.")
-            self.driver.refresh()
+            if self.headless:
+                # A fresh browser has lost the login, so start it over (headed).
+                self.relaunch_headed()
+                return self.login()
+            if not self.resolve_firewall():
+                logger.warning("Still behind firewall after login. Cooling down.")
+                random_sleep(FIREWALL_COOLDOWN, 4)
 
         if "loginError=true" in self.driver.current_url:
             logger.error("Incorrect licence/booking reference. Marking inactive.")
+            self._drop_session()
             self.active = False
             return
 
@@ -268,35 +508,36 @@ class DVSABot:
                 return
 
             # If user indicated "Yes" in current date => earliest test scenario
-            if "Yes" in self.preferences["current-test"]["date"]:
+            if "Yes" in self._current_test_date:
                 logger.info("Earliest test scenario. Changing date/time to earliest.")
-                self.driver.find_element(By.ID, "date-time-change").click()
-                random_sleep(1, 2)
-                self.driver.find_element(By.ID, "test-choice-earliest").click()
-                random_sleep(1, 2)
+                self.wait.until(EC.element_to_be_clickable((By.ID, "date-time-change"))).click()
+                random_sleep(0.1, 0.2)
+                self.wait.until(EC.element_to_be_clickable((By.ID, "test-choice-earliest"))).click()
+                random_sleep(0.1, 0.2)
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                random_sleep(1, 2)
-                self.driver.find_element(By.ID, "driving-licence-submit").click()
+                submit = self.wait.until(EC.element_to_be_clickable((By.ID, "driving-licence-submit")))
+                submit.click()
 
                 if test_center_temp:
                     self.preferences["center"] = [test_center_temp]
-                random_sleep(1, 2)
+                self.wait.until(EC.staleness_of(submit))
             else:
                 logger.info("Going to 'test-centre-change' flow.")
-                self.driver.find_element(By.ID, "test-centre-change").click()
-                random_sleep(3, 2)
-                search_box = self.driver.find_element(By.ID, "test-centres-input")
+                self.wait.until(EC.element_to_be_clickable((By.ID, "test-centre-change"))).click()
+                search_box = self.wait.until(EC.element_to_be_clickable((By.ID, "test-centres-input")))
                 search_box.clear()
                 if self.preferences["center"]:
-                    input_text_box(self.driver, "test-centres-input", self.preferences["center"][0])
+                    type_into(search_box, self.preferences["center"][0])
                 else:
                     logger.warning("No center preference found in config.")
                 self.driver.find_element(By.ID, "test-centres-submit").click()
-                random_sleep(5, 2)
 
-                results_container = self.driver.find_element(By.CLASS_NAME, "test-centre-results")
+                results_container = self.wait.until(
+                    EC.presence_of_element_located((By.CLASS_NAME, "test-centre-results"))
+                )
                 first_link = results_container.find_element(By.XPATH, ".//a")
                 first_link.click()
+                self.wait.until(EC.staleness_of(first_link))
 
             final_status = check_firewall_and_queue(self.driver)
             if final_status in ("firewall", "queue", "error", "login_required"):
@@ -304,6 +545,7 @@ class DVSABot:
                 self.active = False
             else:
                 self.active = True
+                self._save_session()
 
         except Exception as exc:
             logger.error("Error parsing post-login summary: %s", exc)
@@ -324,32 +566,39 @@ class DVSABot:
             return
 
         driver = self.driver
-        search_centre_idx = self.current_centre_index
-        self.current_centre_index = (self.current_centre_index + 1) % len(centres)
-        centre_to_search = centres[search_centre_idx]
+        centre_to_search = centres[0]
 
         try:
-            logger.info("Switching test centre to '%s'", centre_to_search)
-            driver.find_element(By.ID, "change-test-centre").click()
-            random_sleep(2, 2)
-
-            search_box = driver.find_element(By.ID, "test-centres-input")
-            search_box.clear()
-            input_text_box(driver, "test-centres-input", centre_to_search)
-            driver.find_element(By.ID, "test-centres-submit").click()
-            random_sleep(5, 2)
-
-            results_container = driver.find_element(By.CLASS_NAME, "test-centre-results")
-            link = results_container.find_element(By.XPATH, ".//a")
-            link.click()
-            random_sleep(3, 2)
-
-        except NoSuchElementException:
-            logger.error("Could not change test center or find results.")
+            selected = driver.execute_script(
+                "return document.querySelector('.test-centre-name')?.innerText || '';"
+            ).strip().lower()
+            if centre_to_search.lower() in selected:
+                # Already on this centre's calendar: reloading it is enough to
+                # get fresh availability, no need to search for it again.
+                logger.info("Centre '%s' already selected; refreshing its calendar.", centre_to_search)
+                driver.refresh()
+            else:
+                logger.info("Switching test centre to '%s'", centre_to_search)
+                self.wait.until(EC.element_to_be_clickable((By.ID, "change-test-centre"))).click()
+
+                search_box = self.wait.until(EC.element_to_be_clickable((By.ID, "test-centres-input")))
+                search_box.clear()
+                type_into(search_box, centre_to_search)
+                driver.find_element(By.ID, "test-centres-submit").click()
+
+                results_container = self.wait.until(
+                    EC.presence_of_element_located((By.CLASS_NAME, "test-centre-results"))
+                )
+                link = results_container.find_element(By.XPATH, ".//a")
+                link.click()
+                self.wait.until(EC.staleness_of(link))
+
+        except (NoSuchElementException, TimeoutException):
+            # Whatever page we are on, the next pass would fail the same way
+            # from it, so log in again rather than reuse this browser state.
             status = check_firewall_and_queue(driver)
-            if status in ("error", "queue", "firewall", "login_required"):
-                logger.warning("Encountered '%s'. Marking inactive.", status)
-                self.active = False
+            logger.error("Could not change test center or find results (page state '%s'). Marking inactive.", status)
+            self.active = False
             return
         except Exception as exc:
             logger.error("Error while changing centre: %s", exc)
@@ -359,8 +608,7 @@ class DVSABot:
         if not self.active:
             return
 
-        page_source = driver.page_source.lower()
-        if "there are no tests available" in page_source:
+        if page_text_contains(driver, "there are no tests available"):
             logger.info("No test available at centre '%s'", centre_to_search)
             return
         status = check_firewall_and_queue(driver)
@@ -372,11 +620,10 @@ class DVSABot:
         logger.info("Tests appear available, scanning for suitable dates.")
         found, found_date_str, date_el = scan_for_preferred_tests(
             driver=driver,
-            before_date_str=self.preferences.get("before-date"),
-            after_date_str=self.preferences.get("after-date"),
-            unavailable_dates=self.preferences.get("disabled-dates", []),
-            current_test_date=self.preferences["current-test"]["date"],
-            formatted_test_date=FORMATTED_CURRENT_TEST_DATE
+            min_date=self._min_date,
+            max_date=self._max_date,
+            unavailable_dates=self._unavailable,
+            formatted_test_date=self._fmt_current_date
         )
 
         if not found:
@@ -384,47 +631,55 @@ class DVSABot:
             return
 
         try:
-            from datetime import datetime
-
-            target_dt = datetime.strptime(found_date_str, "%Y-%m-%d")
-            attempts = 0
-            while attempts < 12:
-                current_month = driver.find_element(By.CLASS_NAME, "BookingCalendar-currentMonth").text
-                if target_dt.strftime("%B") == current_month:
-                    break
+            target_dt = datetime.fromisoformat(found_date_str)
+            target_month = calendar.month_name[target_dt.month]
+            current_month = driver.find_element(By.CLASS_NAME, "BookingCalendar-currentMonth").text
+            if current_month != target_month:
+                # The calendar only shows the month name, so step back the
+                # difference (mod 12) in one in-page script, then wait once.
+                current_idx = MONTH_NUMBERS[current_month.strip()]
+                months_back = (current_idx - target_dt.month) % 12
+                driver.execute_script(
+                    "const prev = document.querySelector('.BookingCalendar-nav--prev');"
+                    "for (let i = 0; prev && i < arguments[0]; i++) prev.click();",
+                    months_back,
+                )
                 try:
-                    driver.find_element(By.CLASS_NAME, "BookingCalendar-nav--prev").click()
-                except NoSuchElementException:
-                    logger.warning("Could not navigate calendar to previous month.")
-                    break
-                random_sleep(0.1, 0.2)
-                attempts += 1
+                    self.wait.until(
+                        lambda d: d.find_element(By.CLASS_NAME, "BookingCalendar-currentMonth").text == target_month
+                    )
+                except TimeoutException:
+                    logger.warning("Could not navigate calendar to %s.", target_month)
 
             # Select date
             date_el.click()
-            container = driver.find_element(By.ID, f"date-{found_date_str}")
-            label = container.find_element(By.XPATH, ".//label")
-            label_for = label.get_attribute("for")
+            # Slot label, its id and the short-notice flag in one round trip.
+            slot = driver.execute_script(
+                "const label = document.getElementById('date-' + arguments[0]).querySelector('label');"
+                "const labelFor = label.getAttribute('for');"
+                "return {label: label, labelFor: labelFor,"
+                " shortNotice: document.getElementById(labelFor).getAttribute('data-short-notice') === 'true'};",
+                found_date_str,
+            )
+            label = slot["label"]
+            label_for = slot["labelFor"]
+            short_notice = slot["shortNotice"]
             epoch_ms = int(label_for.replace("slot-", "")) / 1000
             test_time_str = datetime.fromtimestamp(epoch_ms).strftime("%H:%M")
 
-            short_notice_raw = driver.find_element(By.ID, label_for).get_attribute("data-short-notice")
-            short_notice = (short_notice_raw == "true")
-
             logger.info("Found test: %s %s. Short notice=%s", found_date_str, test_time_str, short_notice)
-            send_text_available(PHONE_NUMBER, found_date_str, test_time_str)
-            send_text_test_found(PHONE_NUMBER, centre_to_search, found_date_str, test_time_str, short_notice)
+            SMS_POOL.submit(send_text_available, PHONE_NUMBER, centre_to_search, found_date_str, test_time_str)
+            SMS_POOL.submit(send_text_test_found, PHONE_NUMBER, centre_to_search, found_date_str, test_time_str, short_notice)
 
             label.click()
-            time.sleep(0.2)
-            driver.find_element(By.ID, "slot-chosen-submit").click()
-            time.sleep(0.4)
+            self.wait.until(EC.element_to_be_clickable((By.ID, "slot-chosen-submit"))).click()
 
             if short_notice:
-                driver.find_element(By.XPATH, "(//button[@id='slot-warning-continue'])[2]").click()
+                warning_continue = (By.XPATH, "(//button[@id='slot-warning-continue'])[2]")
             else:
-                driver.find_element(By.ID, "slot-warning-continue").click()
-            random_sleep(1, 1)
+                warning_continue = (By.ID, "slot-warning-continue")
+            self.wait.until(EC.element_to_be_clickable(warning_continue)).click()
+            random_sleep(0.1, 0.3)
 
             success = book_test_flow(
                 driver,
@@ -432,23 +687,59 @@ class DVSABot:
                 solve_manually=SOLVE_MANUALLY,
                 coord_top_right=COORD_TOP_RIGHT,
                 coord_bottom_left=COORD_BOTTOM_LEFT,
-                auto_book_test=AUTO_BOOK_TEST
+                auto_book_test=AUTO_BOOK_TEST,
+                headless=self.headless
             )
             if success:
                 logger.info("Successfully booked test on %s at %s", found_date_str, test_time_str)
             else:
                 logger.warning("Failed to finalize booking. Possibly taken or firewall triggered.")
+                if self.headless and check_firewall_and_queue(driver) == "firewall":
+                    # The next pass logs in again with a window the captcha can be clicked in.
+                    self.relaunch_headed()
 
         except Exception as exc:
             logger.error("Failed booking flow: %s", exc)
             capture_screenshot(driver, label="booking_flow")
-            return
+        finally:
+            # Booking leaves the browser on the slot/confirmation screens, not
+            # the manage-booking page the next pass starts from.
+            self.active = False
 
 
 ###############################################################################
 #                          INITIAL BOOKING FLOW                               #
 ###############################################################################
 
+# Link inside a bookable calendar day; the first match is the earliest date.
+FIRST_BOOKABLE_DAY_LINK = ".BookingCalendar-datesBody .BookingCalendar-date--bookable a"
+
+
+def select_test_centre(driver, wait: WebDriverWait, postcode: str):
+    """
+    Initial booking flow, steps 7-9: search for 'postcode' on the test centre
+    page and open the chosen centre (ALTERNATIVE_TEST or Gateshead).
+    """
+    # Step 7: Enter test centre postcode
+    logger.info("Entering postcode: %s", postcode)
+    search_box = wait.until(EC.element_to_be_clickable((By.ID, "test-centres-input")))
+    search_box.clear()
+    type_into(search_box, postcode)
+
+    # Step 8: Click 'Find test centres'
+    driver.find_element(By.ID, "test-centres-submit").click()
+
+    # Step 9: Click the test centre link (e.g., Gateshead or alternative)
+    logger.info("Clicking test centre link.")
+    if ALTERNATIVE_TEST is not None:
+        centre_id = f"centre-name-{ALTERNATIVE_TEST[1]}"
+    else:
+        centre_id = "centre-name-957"
+    centre_link = wait.until(EC.element_to_be_clickable((By.ID, centre_id)))
+    centre_link.click()
+    wait.until(EC.staleness_of(centre_link))
+
+
 def run_initial_booking_flow(config_data):
     """
     Flow for the initial test booking:
@@ -458,8 +749,18 @@ def run_initial_booking_flow(config_data):
       - Click through to test centre page
       - Choose an available slot
       - Click continue and confirm
+
+    One browser session is shared by all attempts and only rebuilt if it dies.
     """
     logger.info("Starting Initial Booking Flow...")
+    bot = DVSABot(config_data)
+    try:
+        run_initial_booking_attempts(bot, config_data)
+    finally:
+        bot.quit_driver()
+
+
+def run_initial_booking_attempts(bot: DVSABot, config_data):
     licence_num = config_data.get("licence", "")
 
     # Use alternative test centre if defined; otherwise, default postcode.
@@ -471,6 +772,7 @@ def run_initial_booking_flow(config_data):
     attempt = 0
     # Loop until we complete a booking attempt or hit MAX_ATTEMPTS.
     while attempt < MAX_ATTEMPTS:
+        sleep_until_open(DVSA_OPEN_TIME, DVSA_CLOSE_TIME)
         # Check if DVSA is open; if not, wait without counting as an attempt.
         if not is_time_between(DVSA_OPEN_TIME, DVSA_CLOSE_TIME):
             logger.info("Currently outside DVSA operational hours (%s - %s). Waiting...",
@@ -481,83 +783,46 @@ def run_initial_booking_flow(config_data):
         logger.info("-" * 60)
         logger.info("Initial booking attempt %d / %d", attempt + 1, MAX_ATTEMPTS)
         print("DVSA is open. Proceeding with booking flow.")
-        driver = None
 
         try:
-            # Setup driver
-            print("Setting up driver...")
-            chrome_options = uc.ChromeOptions()
-            if BLOCK_IMAGES:
-                print("Blocking images to speed up loading...")
-                prefs = {"profile.managed_default_content_settings.images": 2}
-                chrome_options.add_experimental_option("prefs", prefs)
-            else:
-                print("Not blocking images. Loading everything...")
-
-            if RUN_ON_VM:
-                print("Running on VM. Adding VM-specific options...")
-                chrome_options.add_argument("--disable-gpu")
-                chrome_options.add_argument("window-size=1400,900")
-                chrome_options.add_argument(
-                    "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.131 Safari/537.36"
-                )
-            else:
-                print("Not running on VM. Using default options.")
+            if not is_driver_alive(bot.driver):
+                bot.quit_driver()
+                bot.setup_driver()
+            driver, wait = bot.driver, bot.wait
 
-            if BUSTER_ENABLED:
-                print("Adding Buster extension for captcha solving...")
-                chrome_options.add_extension(BUSTER_PATH)
-            else:
-                print("Not using Buster extension.")
-
-            # Set the Chrome binary location (adjust if you use Chromium)
-            chrome_options.binary_location = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
-            print("Using Chrome binary:", chrome_options.binary_location)
-
-            # Launch the driver using your local chromedriver and disable patching.
-            driver = uc.Chrome(
-                driver_executable_path=r"C:\chromedriver\chromedriver.exe",  # Adjust path as needed
-                options=chrome_options,
-                use_subprocess=True,
-                patcher=False
-            )
-
-            logger.info("Driver created for initial booking flow.")
+            # The driver loads eagerly, so get() returns as soon as the DOM is ready.
             driver.get(DVSA_APPLICATION_URL)
-            time.sleep(2)
 
             # --- CAPTCHA/FIREWALL HANDLING ---
             for _ in range(5):
                 status = check_firewall_and_queue(driver)
                 if status in ("queue", "firewall"):
                     logger.info("Handling queue/firewall or recaptcha.")
-                    solved = solve_captcha(
-                        driver,
-                        skip=SOLVE_MANUALLY,
-                        coord_top_right=COORD_TOP_RIGHT,
-                        coord_bottom_left=COORD_BOTTOM_LEFT
-                    )
-                    if not solved:
-                        logger.warning("Captcha failed. Refreshing...")
-                        driver.refresh()
-                        time.sleep(3)
+                    # Only a captcha needs the window; relaunching in the queue would lose our place.
+                    if status == "firewall" and bot.headless:
+                        bot.relaunch_headed()
+                        driver, wait = bot.driver, bot.wait
+                        driver.get(DVSA_APPLICATION_URL)
                         continue
-                    else:
+                    if bot.resolve_firewall():
                         break
+                    logger.warning("Captcha failed. Retrying...")
+                    continue
                 elif status in ("ok", "login_required"):
                     break
                 elif status == "error":
                     logger.warning("Error page encountered. Refreshing.")
-                    time.sleep(3)
                     driver.refresh()
-                time.sleep(2)
+                random_sleep(0.2, 0.4)
             # --- End of CAPTCHA/FIREWALL HANDLING ---
 
             # --- NEW: Queue Handling (after captcha is solved) ---
+            # The counter is updated in place, so its handle is kept between checks.
+            queue_elem = None
             while True:
                 try:
-                    queue_elem = driver.find_element(By.ID, "MainPart_lbUsersInLineAheadOfYouText")
+                    if queue_elem is None:
+                        queue_elem = driver.find_element(By.ID, "MainPart_lbUsersInLineAheadOfYouText")
                     if queue_elem.is_displayed():
                         logger.info("Queue detected: %s", queue_elem.text)
                         logger.info("Waiting in queue... checking again in 10 seconds.")
@@ -566,6 +831,9 @@ def run_initial_booking_flow(config_data):
                         continue
                     else:
                         break
+                except StaleElementReferenceException:
+                    # The queue page re-rendered; look the counter up again.
+                    queue_elem = None
                 except NoSuchElementException:
                     break
                 except Exception as e:
@@ -580,7 +848,7 @@ def run_initial_booking_flow(config_data):
                     logger.info("Detected Oops page. Clicking 'Continue' button to proceed.")
                     continue_button = driver.find_element(By.XPATH, "//button[contains(text(), 'Continue')]")
                     continue_button.click()
-                    time.sleep(2)
+                    wait.until(EC.staleness_of(continue_button))
             except NoSuchElementException:
                 logger.info("No Oops page detected. Proceeding with booking flow.")
             except Exception as e:
@@ -588,52 +856,36 @@ def run_initial_booking_flow(config_data):
             # --- End of Oops Page Handling ---
 
             # Step 1: Click 'Car (manual and automatic)' button
-            driver.find_element(By.ID, "test-type-car").click()
-            time.sleep(1)
+            wait.until(EC.element_to_be_clickable((By.ID, "test-type-car"))).click()
 
             # Step 2: Fill in licence number
-            input_text_box(driver, "driving-licence", licence_num)
-            time.sleep(1)
+            type_into(wait.until(EC.element_to_be_clickable((By.ID, "driving-licence"))), licence_num)
 
             # Step 3: Select 'No special needs'
-            driver.find_element(By.ID, "special-needs-none").click()
-            time.sleep(0.5)
+            wait.until(EC.element_to_be_clickable((By.ID, "special-needs-none"))).click()
 
             # Step 4: Click first 'Continue'
-            driver.find_element(By.ID, "driving-licence-submit").click()
-            time.sleep(3)
+            submit = driver.find_element(By.ID, "driving-licence-submit")
+            submit.click()
+            wait.until(EC.staleness_of(submit))
 
             # Step 5: Fill in test date (for testing, set to a fixed date; otherwise, use one week from now)
             future_date = (datetime.now() + timedelta(days=14)).strftime("%d/%m/%y")
 
             logger.info("Entering preferred test date: %s", future_date)
-            input_text_box(driver, "test-choice-calendar", future_date)
-            time.sleep(1)
+            type_into(wait.until(EC.element_to_be_clickable((By.ID, "test-choice-calendar"))), future_date)
 
             # Step 6: Click 'Continue' again (same ID as before)
-            driver.find_element(By.ID, "driving-licence-submit").click()
-            time.sleep(2)
+            submit = driver.find_element(By.ID, "driving-licence-submit")
+            submit.click()
+            wait.until(EC.staleness_of(submit))
 
             # --- NEW: Save the current URL before entering the postcode ---
             saved_url = driver.current_url
             logger.info("Saved URL for test centre page: %s", saved_url)
 
-            # Step 7: Enter test centre postcode
-            logger.info("Entering postcode: %s", postcode)
-            input_text_box(driver, "test-centres-input", postcode)
-            time.sleep(1)
-
-            # Step 8: Click 'Find test centres'
-            driver.find_element(By.ID, "test-centres-submit").click()
-            time.sleep(3)
-
-            # Step 9: Click the test centre link (e.g., Gateshead or alternative)
-            logger.info("Clicking test centre link.")
-            if ALTERNATIVE_TEST is not None:
-                driver.find_element(By.ID, f"centre-name-{ALTERNATIVE_TEST[1]}").click()
-            else:
-                driver.find_element(By.ID, "centre-name-957").click()
-            time.sleep(3)
+            # Steps 7-9: Search the postcode and open the test centre
+            select_test_centre(driver, wait, postcode)
 
             # --- Step 10: Click the first bookable date on the calendar with retries ---
             found_bookable_date = False
@@ -641,10 +893,9 @@ def run_initial_booking_flow(config_data):
             for retry in range(max_date_retries):
                 try:
                     logger.info("Looking for first bookable calendar date (attempt %d)...", retry + 1)
-                    calendar_container = driver.find_element(By.CLASS_NAME, "BookingCalendar-datesBody")
-                    bookable_days = calendar_container.find_elements(By.CLASS_NAME, "BookingCalendar-date--bookable")
+                    links = driver.find_elements(By.CSS_SELECTOR, FIRST_BOOKABLE_DAY_LINK)
 
-                    if not bookable_days:
+                    if not links:
                         logger.warning("No bookable dates available on attempt %d.", retry + 1)
                         capture_screenshot(driver, label="no_bookable_dates")
                         wait_time = random.uniform(10, 20)
@@ -652,26 +903,15 @@ def run_initial_booking_flow(config_data):
                         time.sleep(wait_time)
                         # Instead of refreshing, revisit the saved URL and redo steps 7-9.
                         driver.get(saved_url)
-                        time.sleep(3)
-                        logger.info("Re-entering postcode: %s", postcode)
-                        input_text_box(driver, "test-centres-input", postcode)
-                        time.sleep(1)
-                        driver.find_element(By.ID, "test-centres-submit").click()
-                        time.sleep(3)
-                        if ALTERNATIVE_TEST is not None:
-                            driver.find_element(By.ID, f"centre-name-{ALTERNATIVE_TEST[1]}").click()
-                        else:
-                            driver.find_element(By.ID, "centre-name-957").click()
-                        time.sleep(3)
+                        select_test_centre(driver, wait, postcode)
                         continue
                     # Found at least one bookable day.
                     found_bookable_date = True
-                    first_day = bookable_days[0]
-                    link = first_day.find_element(By.TAG_NAME, "a")
+                    link = links[0]
                     date_str = link.get_attribute("data-date")
                     logger.info("Clicking bookable date: %s", date_str)
                     link.click()
-                    time.sleep(2)
+                    random_sleep(0.1, 0.2)
                     break
                 except Exception as exc:
                     logger.error("Error looking for bookable date on attempt %d: %s", retry + 1, exc)
@@ -680,19 +920,7 @@ def run_initial_booking_flow(config_data):
                     logger.info("Waiting for %.2f seconds before revisiting the test centre page...", wait_time)
                     time.sleep(wait_time)
                     driver.get(saved_url)
-                    time.sleep(3)
-                    logger.info("Re-entering postcode: %s", postcode)
-                    element = driver.find_element(By.ID, "test-centres-input")
-                    element.clear()
-                    input_text_box(driver, "test-centres-input", postcode)
-                    time.sleep(1)
-                    driver.find_element(By.ID, "test-centres-submit").click()
-                    time.sleep(3)
-                    if ALTERNATIVE_TEST is not None:
-                        driver.find_element(By.ID, f"centre-name-{ALTERNATIVE_TEST[1]}").click()
-                    else:
-                        driver.find_element(By.ID, "centre-name-957").click()
-                    time.sleep(3)
+                    select_test_centre(driver, wait, postcode)
             if not found_bookable_date:
                 logger.error("Failed to find any bookable date after %d attempts.", max_date_retries)
                 return
@@ -707,7 +935,6 @@ def run_initial_booking_flow(config_data):
                     return
                 # Click the first available slot
                 slot_labels[0].click()
-                time.sleep(1)
                 logger.info("Slot selected.")
             except Exception as exc:
                 logger.error("Error choosing available slot: %s", exc)
@@ -717,8 +944,7 @@ def run_initial_booking_flow(config_data):
             # Step 12: Click the continue button for the chosen slot
             try:
                 logger.info("Clicking slot chosen continue button.")
-                driver.find_element(By.ID, "slot-chosen-submit").click()
-                time.sleep(1)
+                wait.until(EC.element_to_be_clickable((By.ID, "slot-chosen-submit"))).click()
             except Exception as exc:
                 logger.error("Error clicking slot chosen continue button: %s", exc)
                 capture_screenshot(driver, label="slot_continue_error")
@@ -727,8 +953,7 @@ def run_initial_booking_flow(config_data):
             # Step 13: Click the confirm button
             try:
                 logger.info("Clicking confirm button.")
-                driver.find_element(By.ID, "slot-warning-continue").click()
-                time.sleep(2)
+                wait.until(EC.element_to_be_clickable((By.ID, "slot-warning-continue"))).click()
             except Exception as exc:
                 logger.error("Error clicking confirm button: %s", exc)
                 capture_screenshot(driver, label="confirm_button_error")
@@ -743,17 +968,13 @@ def run_initial_booking_flow(config_data):
         except Exception as exc:
             logger.error("Top-level exception in initial booking attempt: %s", exc)
             logger.debug(traceback.format_exc())
-            if driver:
-                capture_screenshot(driver, label="initial_booking_exception")
+            if is_driver_alive(bot.driver):
+                capture_screenshot(bot.driver, label="initial_booking_exception")
+            else:
+                logger.warning("Browser session is gone; a new one will be started.")
+                bot.quit_driver()
             time.sleep(5)
 
-        finally:
-            if driver:
-                try:
-                    driver.quit()
-                except:
-                    pass
-
         attempt += 1
 
     if attempt >= MAX_ATTEMPTS:
@@ -771,55 +992,90 @@ def run_initial_booking_flow(config_data):
 ###############################################################################
 
 def main():
-    if not os.path.exists("error_screenshots"):
-        os.makedirs("error_screenshots")
-
     logger.info("=" * 80)
     logger.info("DVSA Script Start - %s", datetime.now())
     logger.info("Mode: %s", BOOKING_MODE.upper())
     logger.info("=" * 80)
 
     wait_for_internet_connection()
-    config_data = parse_config(CONFIG)
+    try:
+        config_data = parse_config(CONFIG_PATH)
+    except ValueError as exc:
+        logger.error("Cannot start: %s", exc)
+        return
     logger.info("Preferences loaded:\n%s", config_data)
 
-    if BOOKING_MODE == "reschedule":
-        run_reschedule_flow(config_data)
-    elif BOOKING_MODE == "booking":
-        run_initial_booking_flow(config_data)
-    else:
-        logger.error("Unknown booking_mode in config: '%s'. Exiting.", BOOKING_MODE)
-
-
-def run_reschedule_flow(config_data):
-    for attempt in range(MAX_ATTEMPTS):
-        logger.info("-" * 60)
-        logger.info("Reschedule attempt %d / %d", attempt + 1, MAX_ATTEMPTS)
+    try:
+        if BOOKING_MODE == "reschedule":
+            run_reschedule_flow(config_data)
+        elif BOOKING_MODE == "booking":
+            run_initial_booking_flow(config_data)
+        else:
+            logger.error("Unknown booking_mode in config: '%s'. Exiting.", BOOKING_MODE)
+    finally:
+        # Let any queued SMS alerts finish sending before the process exits.
+        SMS_POOL.shutdown(wait=True)
 
-        if is_time_between(DVSA_OPEN_TIME, DVSA_CLOSE_TIME):
-            try:
-                bot = DVSABot(config_data)
-                bot.login()
-                if bot.active:
-                    bot.search_and_book()
-                random_sleep(DVSA_DELAY, 10)
 
-            except Exception as exc:
-                logger.error("Top-level exception in reschedule attempt: %s", exc)
-                logger.debug(traceback.format_exc())
-                if 'bot' in locals() and bot.driver:
-                    capture_screenshot(bot.driver, label="top_level_exception")
-                try:
-                    bot.driver.quit()
-                except:
-                    pass
-                time.sleep(30)
+def run_centre_search(bot: DVSABot) -> bool:
+    """
+    One reschedule pass for a single bot: (re)login if needed, then search
+    its centre. The bot keeps its browser between passes; it is only rebuilt
+    if the session died. Runs on a worker thread; returns False if the pass
+    blew up.
+    """
+    try:
+        if not bot.active:
+            bot.login()
+        if bot.active:
+            bot.search_and_book()
+        return True
+    except Exception as exc:
+        logger.error("Top-level exception in reschedule attempt: %s", exc)
+        logger.debug(traceback.format_exc())
+        if is_driver_alive(bot.driver):
+            capture_screenshot(bot.driver, label="top_level_exception")
+            bot.active = False
         else:
-            logger.info("Currently outside DVSA operational hours (%s - %s).", DVSA_OPEN_TIME, DVSA_CLOSE_TIME)
-            random_sleep(10, 5)
+            logger.warning("Browser session is gone; a new one will be started.")
+            bot.quit_driver()
+        return False
 
-        if attempt == MAX_ATTEMPTS - 1:
-            logger.info("Reached max reschedule attempts. Exiting.")
+
+def run_reschedule_flow(config_data):
+    centres = config_data.get("center", [])
+    if "Yes" in config_data["current-test"]["date"]:
+        # Earliest-test mode searches the booked centre, so one bot is enough.
+        centres = centres[:1] or [config_data["current-test"]["center"]]
+    if not centres:
+        logger.warning("No test centres specified in preferences.")
+        return
+
+    # One long-lived bot (and browser) per centre, reused across attempts.
+    bots = [DVSABot({**config_data, "center": [centre]}) for centre in centres]
+    workers = min(len(bots), MAX_PARALLEL_BOTS)
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dvsa-bot") as pool:
+            for attempt in range(MAX_ATTEMPTS):
+                logger.info("-" * 60)
+                logger.info("Reschedule attempt %d / %d (%d centres)", attempt + 1, MAX_ATTEMPTS, len(bots))
+
+                sleep_until_open(DVSA_OPEN_TIME, DVSA_CLOSE_TIME)
+                if is_time_between(DVSA_OPEN_TIME, DVSA_CLOSE_TIME):
+                    results = list(pool.map(run_centre_search, bots))
+                    if all(results):
+                        random_sleep(DVSA_DELAY, 10)
+                    else:
+                        time.sleep(30)
+                else:
+                    logger.info("Currently outside DVSA operational hours (%s - %s).", DVSA_OPEN_TIME, DVSA_CLOSE_TIME)
+                    random_sleep(10, 5)
+
+                if attempt == MAX_ATTEMPTS - 1:
+                    logger.info("Reached max reschedule attempts. Exiting.")
+    finally:
+        for bot in bots:
+            bot.quit_driver()
 
 
 if __name__ == "__main__":
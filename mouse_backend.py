@@ -0,0 +1,307 @@
+# mouse_backend.py
+#
+# Thin OS cursor layer used by clicker.py. Exposes position(), move_to(x, y),
+# glide(xs, ys, delays, sleep), press(), release() and SCREEN_SIZE:
+#   - Windows: SetCursorPos / SendInput through ctypes.
+#   - Linux under Wayland: a virtual absolute pointer on /dev/uinput (or the
+#     pynput path through XWayland when /dev/uinput is not writable).
+#   - Linux under X11 and macOS: a single, reused pynput Controller.
+#   - PyAutoGUI only as a last-resort fallback on macOS (with its PAUSE disabled).
+
+import os
+import sys
+import logging
+
+logger = logging.getLogger(__name__)
+
+_uinput_fd = None
+if sys.platform.startswith("linux") and os.environ.get("XDG_SESSION_TYPE") == "wayland":
+    try:
+        _uinput_fd = os.open("/dev/uinput", os.O_WRONLY | os.O_NONBLOCK)
+    except OSError as exc:
+        # Not writable by default; Chrome still runs under XWayland, which pynput can drive.
+        logger.warning("Cannot open /dev/uinput (%s); falling back to pynput via XWayland.", exc)
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    import numpy as np
+
+    _user32 = ctypes.windll.user32
+
+    INPUT_MOUSE = 0
+    MOUSEEVENTF_MOVE = 0x0001
+    MOUSEEVENTF_LEFTDOWN = 0x0002
+    MOUSEEVENTF_LEFTUP = 0x0004
+    MOUSEEVENTF_ABSOLUTE = 0x8000
+    SM_CXSCREEN = 0
+    SM_CYSCREEN = 1
+
+    class MOUSEINPUT(ctypes.Structure):
+        _fields_ = [
+            ("dx", wintypes.LONG),
+            ("dy", wintypes.LONG),
+            ("mouseData", wintypes.DWORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ctypes.c_size_t),  # ULONG_PTR
+        ]
+
+    class _INPUTUNION(ctypes.Union):
+        _fields_ = [("mi", MOUSEINPUT)]
+
+    class INPUT(ctypes.Structure):
+        _anonymous_ = ("u",)
+        _fields_ = [("type", wintypes.DWORD), ("u", _INPUTUNION)]
+
+    _INPUT_SIZE = ctypes.sizeof(INPUT)
+
+    # np.dtype(INPUT) gets the union's alignment wrong (1 instead of 8 on
+    # 64-bit), so the dtype is laid out explicitly from the ctypes offsets.
+    _MI_DTYPE = np.dtype({
+        "names": [name for name, _ in MOUSEINPUT._fields_],
+        "formats": [np.dtype(ctype) for _, ctype in MOUSEINPUT._fields_],
+        "offsets": [getattr(MOUSEINPUT, name).offset for name, _ in MOUSEINPUT._fields_],
+        "itemsize": ctypes.sizeof(MOUSEINPUT),
+    })
+    _INPUT_DTYPE = np.dtype({
+        "names": ["type", "mi"],
+        "formats": [np.dtype(wintypes.DWORD), _MI_DTYPE],
+        "offsets": [INPUT.type.offset, INPUT.u.offset],
+        "itemsize": _INPUT_SIZE,
+    })
+    assert _INPUT_DTYPE.itemsize == _INPUT_SIZE, "INPUT dtype does not match the ctypes layout"
+
+    def _send_button(flags: int):
+        event = INPUT(type=INPUT_MOUSE, mi=MOUSEINPUT(0, 0, 0, flags, 0, 0))
+        _user32.SendInput(1, ctypes.byref(event), _INPUT_SIZE)
+
+    def screen_size():
+        return _user32.GetSystemMetrics(SM_CXSCREEN), _user32.GetSystemMetrics(SM_CYSCREEN)
+
+    def position():
+        point = wintypes.POINT()
+        _user32.GetCursorPos(ctypes.byref(point))
+        return point.x, point.y
+
+    def move_to(x: float, y: float):
+        _user32.SetCursorPos(int(x), int(y))
+
+    def glide(xs, ys, delays, sleep):
+        """
+        Replays a precomputed path as absolute-move SendInput events. The
+        INPUT array is filled in one vectorized pass; with delays=None the
+        whole path goes to the kernel in a single SendInput call.
+        """
+        n = len(xs)
+        if not n:
+            return
+        width, height = SCREEN_SIZE
+
+        events = np.zeros(n, dtype=_INPUT_DTYPE)
+        events["type"] = INPUT_MOUSE
+        mi = events["mi"]
+        # Absolute coords are normalised to 0..65535 across the primary monitor.
+        mi["dx"] = (np.asarray(xs, dtype=np.int64) * 65535) // max(width - 1, 1)
+        mi["dy"] = (np.asarray(ys, dtype=np.int64) * 65535) // max(height - 1, 1)
+        mi["dwFlags"] = MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE
+
+        base = events.ctypes.data
+        if delays is None:
+            _user32.SendInput(n, ctypes.c_void_p(base), _INPUT_SIZE)
+            return
+        for i, delay in enumerate(delays):
+            _user32.SendInput(1, ctypes.c_void_p(base + i * _INPUT_SIZE), _INPUT_SIZE)
+            sleep(delay)
+
+    def press():
+        _send_button(MOUSEEVENTF_LEFTDOWN)
+
+    def release():
+        _send_button(MOUSEEVENTF_LEFTUP)
+
+    BACKEND = "win32"
+
+elif _uinput_fd is not None:
+    # Wayland compositors ignore X11 cursor warps, so we register our own
+    # absolute pointer (like a VM "tablet") with the kernel and feed it events.
+    import atexit
+    import fcntl
+    import struct
+
+    EV_SYN = 0x00
+    EV_KEY = 0x01
+    EV_ABS = 0x03
+    SYN_REPORT = 0x00
+    BTN_LEFT = 0x110
+    ABS_X = 0x00
+    ABS_Y = 0x01
+    ABS_CNT = 0x40
+    BUS_VIRTUAL = 0x06
+
+    UI_SET_EVBIT = 0x40045564
+    UI_SET_KEYBIT = 0x40045565
+    UI_SET_ABSBIT = 0x40045567
+    UI_DEV_CREATE = 0x5501
+    UI_DEV_DESTROY = 0x5502
+
+    # struct input_event: struct timeval, __u16 type, __u16 code, __s32 value
+    _EVENT = struct.Struct("llHHi")
+
+    # Wayland gives clients no way to ask for the screen size, so it is configured.
+    _width, _height = (
+        int(v) for v in os.environ.get("CLICKER_SCREEN_SIZE", "1920x1080").lower().split("x")
+    )
+
+    _fd = _uinput_fd
+    for _ev in (EV_SYN, EV_KEY, EV_ABS):
+        fcntl.ioctl(_fd, UI_SET_EVBIT, _ev)
+    fcntl.ioctl(_fd, UI_SET_KEYBIT, BTN_LEFT)
+    fcntl.ioctl(_fd, UI_SET_ABSBIT, ABS_X)
+    fcntl.ioctl(_fd, UI_SET_ABSBIT, ABS_Y)
+
+    # struct uinput_user_dev: name, input_id, ff_effects_max, absmax/absmin/absfuzz/absflat
+    _absmax = [0] * ABS_CNT
+    _absmax[ABS_X] = _width - 1
+    _absmax[ABS_Y] = _height - 1
+    _zeros = [0] * ABS_CNT
+    os.write(_fd, struct.pack(
+        "80sHHHHI%di" % (4 * ABS_CNT),
+        b"dvsa-bot-pointer", BUS_VIRTUAL, 0x1, 0x1, 0x1, 0,
+        *_absmax, *_zeros, *_zeros, *_zeros,
+    ))
+    fcntl.ioctl(_fd, UI_DEV_CREATE)
+
+    def _close():
+        fcntl.ioctl(_fd, UI_DEV_DESTROY)
+        os.close(_fd)
+
+    atexit.register(_close)
+
+    # uinput is write-only, so we remember where we last put the cursor.
+    _pos = [_width // 2, _height // 2]
+
+    def _move_events(x: int, y: int) -> bytes:
+        return (
+            _EVENT.pack(0, 0, EV_ABS, ABS_X, x)
+            + _EVENT.pack(0, 0, EV_ABS, ABS_Y, y)
+            + _EVENT.pack(0, 0, EV_SYN, SYN_REPORT, 0)
+        )
+
+    def screen_size():
+        return _width, _height
+
+    def position():
+        return tuple(_pos)
+
+    def move_to(x: float, y: float):
+        _pos[:] = int(x), int(y)
+        os.write(_fd, _move_events(*_pos))
+
+    def glide(xs, ys, delays, sleep):
+        if delays is None:
+            xs, ys, delays = xs[-1:], ys[-1:], (0.0,)
+        for xi, yi, delay in zip(xs, ys, delays):
+            os.write(_fd, _move_events(xi, yi))
+            sleep(delay)
+        if len(xs):
+            _pos[:] = int(xs[-1]), int(ys[-1])
+
+    def _button(value: int):
+        os.write(_fd, _EVENT.pack(0, 0, EV_KEY, BTN_LEFT, value) + _EVENT.pack(0, 0, EV_SYN, SYN_REPORT, 0))
+
+    def press():
+        _button(1)
+
+    def release():
+        _button(0)
+
+    BACKEND = "uinput"
+
+else:
+    try:
+        from pynput.mouse import Button, Controller
+    except ImportError:
+        # PyAutoGUI goes through python-xlib on Linux anyway; require pynput there.
+        if sys.platform.startswith("linux"):
+            raise
+        Controller = None
+
+    if Controller is not None:
+        # One controller for the whole process, so the display connection is opened once.
+        _mouse = Controller()
+
+        if sys.platform == "darwin":
+            import Quartz  # pyobjc, already required by pynput on macOS
+
+            def screen_size():
+                display = Quartz.CGMainDisplayID()
+                return Quartz.CGDisplayPixelsWide(display), Quartz.CGDisplayPixelsHigh(display)
+        else:
+            from Xlib import display as xdisplay  # python-xlib, already required by pynput
+
+            def screen_size():
+                screen = xdisplay.Display().screen()
+                return screen.width_in_pixels, screen.height_in_pixels
+
+        def position():
+            return _mouse.position
+
+        def move_to(x: float, y: float):
+            _mouse.position = (int(x), int(y))
+
+        def glide(xs, ys, delays, sleep):
+            if delays is None:
+                xs, ys, delays = xs[-1:], ys[-1:], (0.0,)
+            for xi, yi, delay in zip(xs, ys, delays):
+                _mouse.position = (xi, yi)
+                sleep(delay)
+
+        def press():
+            _mouse.press(Button.left)
+
+        def release():
+            _mouse.release(Button.left)
+
+        BACKEND = "pynput"
+
+    else:
+        import pyautogui
+
+        # PyAutoGUI sleeps PAUSE seconds after every call and raises when the cursor
+        # reaches a corner; our timing is handled by clicker.py.
+        pyautogui.PAUSE = 0
+        pyautogui.FAILSAFE = False
+
+        _move = pyautogui.moveTo
+
+        position = pyautogui.position
+
+        def screen_size():
+            return tuple(pyautogui.size())
+        press = pyautogui.mouseDown
+        release = pyautogui.mouseUp
+
+        def move_to(x: float, y: float):
+            _move(x, y)
+
+        def glide(xs, ys, delays, sleep):
+            if delays is None:
+                xs, ys, delays = xs[-1:], ys[-1:], (0.0,)
+            for xi, yi, delay in zip(xs, ys, delays):
+                _move(xi, yi)
+                sleep(delay)
+
+        BACKEND = "pyautogui"
+        logger.warning("pynput not installed; falling back to PyAutoGUI for mouse input.")
+
+# Primary screen size in pixels, read once.
+SCREEN_SIZE = screen_size()
+
+# Pay first-call costs (display connection, lazy submodule imports, DC queries)
+# at import rather than on the first captcha click.
+try:
+    position()
+except Exception as exc:
+    logger.warning("Mouse backend warm-up failed: %s", exc)
@@ -0,0 +1,41 @@
+import os
+import sys
+import tempfile
+import unittest
+from configparser import ConfigParser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from util import fast_parse_ini
+
+
+class FastParseIniTest(unittest.TestCase):
+
+    def _parse_both(self, content: str):
+        fd, path = tempfile.mkstemp(suffix=".ini")
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+        config = ConfigParser()
+        config.read(path, encoding="utf-8")
+        return fast_parse_ini(path), dict(config["preferences"])
+
+    def test_empty_value_does_not_take_the_next_line(self):
+        fast, expected = self._parse_both("[preferences]\nbefore_date=\nafter_date=2022-01-01\n")
+        self.assertEqual(fast, expected)
+        self.assertEqual(fast["before_date"], "")
+        self.assertEqual(fast["after_date"], "2022-01-01")
+
+    def test_matches_configparser_with_spacing_and_crlf(self):
+        fast, expected = self._parse_both(
+            "[preferences]\r\n"
+            "; comment = ignored\r\n"
+            "before_date =   \r\n"
+            "after_date : 2022-01-01  \r\n"
+            "center = [\"Gosforth\"]\r\n"
+        )
+        self.assertEqual(fast, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
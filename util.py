@@ -1,30 +1,140 @@
 import os
+import re
 import ast
 import json
 import time
 import random
+import socket
 import logging
+import threading
 import requests
 
+from requests.adapters import HTTPAdapter
+
 from configparser import ConfigParser
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from datetime import time as dtime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 
 import text  # Custom 'text' module that handles Twilio SMS logic.
 from clicker import hardware_click_range  # Your custom hardware click function.
 
 logger = logging.getLogger(__name__)
 
+# Page-state markers (lowercase), looked up in a lowercased page source.
+_PAGE_STATE_MARKERS = (
+    ("unsuccessful", "request unsuccessful"),
+    ("incident", "incident id"),
+    ("login", "enter details below to access your booking"),
+    ("oops", "oops"),
+)
+_IMPERVA_RE = re.compile(r"imperva", re.I)
+
+# In-browser text checks for _contains_text (lowercase).
+_SLOT_TAKEN_TEXT = "the time chosen is no longer available"
+_REQUEST_UNSUCCESSFUL_TEXT = "request unsuccessful"
+_INCIDENT_ID_TEXT = "incident id"
+_PUZZLE_TEXT = "why am i seeing this page"
+_BOOKING_PAGE_NEEDLES = (_SLOT_TAKEN_TEXT, _REQUEST_UNSUCCESSFUL_TEXT, _INCIDENT_ID_TEXT)
+_PUZZLE_NEEDLES = (_PUZZLE_TEXT,)
+
+# capture_screenshot() writes here (next to this file); created on first use.
+SCREENSHOT_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "error_screenshots")
+
+# Max seconds book_test_flow waits for its buttons to become clickable.
+BOOKING_WAIT_TIMEOUT = 5
+
+# Shared HTTP session: keep-alive sockets are reused between requests. Retries
+# are disabled here because callers handle their own backoff.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0))
+
+# "key = value" / "key: value" at the start of a line; comment lines never match.
+# Only spaces/tabs are skipped, so an empty value never runs into the next line.
+_INI_KEY_RE = re.compile(r"^(?P<k>[A-Za-z0-9_\-\.]+)[ \t]*[:=][ \t]*(?P<v>[^\r\n]*?)[ \t\r]*$", re.M)
+
+
+def fast_parse_ini(path: str) -> dict:
+    """
+    Reads every key of an INI file into one flat {key: value} dict in a single
+    regex pass (keys lowercased like ConfigParser; later sections win).
+    No interpolation or multi-line values - config.ini uses neither.
+    """
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    return {m.group("k").lower(): m.group("v") for m in _INI_KEY_RE.finditer(content)}
+
 
-def parse_config(config: ConfigParser) -> dict:
+def _parse_bound(key: str, value: str):
+    """
+    Parses a before_date/after_date value, written either YYYY-MM-DD or in
+    config.ini's DD/MM/YYYY. Returns None when unset; raises ValueError
+    naming 'key' for anything else, so a typo stops the bot at startup.
+    """
+    if not value or value == "None":
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(value, "%d/%m/%Y")
+    except ValueError:
+        raise ValueError(f"Invalid {key} in config.ini: {value!r} (expected DD/MM/YYYY or YYYY-MM-DD)") from None
+
+
+def date_window(current_test_date: str, before_date_str: str, after_date_str: str) -> tuple:
+    """
+    Works out the (min_date, max_date) datetimes a new test must fall strictly
+    between: before the current test (minus a day) and before_date, and after
+    after_date. Raises ValueError for a malformed before_date/after_date.
+    """
+    # If "Yes" in current_test_date, treat that as no real date
+    if current_test_date and "Yes" in current_test_date:
+        min_date = datetime.fromisoformat("2050-12-12")
+    else:
+        # E.g. "Wednesday 15 December 2025 2:43PM"
+        try:
+            dt_current_test = datetime.strptime(current_test_date, "%A %d %B %Y %I:%M%p")
+            min_date = dt_current_test - timedelta(days=1)
+        except:
+            min_date = datetime.fromisoformat("2050-12-12")
+
+    # If we have an explicit before_date, override
+    parsed_before = _parse_bound("before_date", before_date_str)
+    if parsed_before is not None and parsed_before < min_date:
+        min_date = parsed_before
+
+    max_date = _parse_bound("after_date", after_date_str) or datetime.fromisoformat("2000-01-01")
+
+    return min_date, max_date
+
+
+def parse_config(config, use_fast: bool = True) -> dict:
     """
     Parses the [preferences] section of config.ini into a dictionary,
     consistently using DD/MM/YYYY strings (or possibly with time),
-    and returning only JSON-serializable data.
+    and returning only plain data (strings, bools, a tuple of centres, a
+    frozenset of disabled dates and the min/max date window as datetimes).
+
+    'config' is either the path to config.ini (read with fast_parse_ini) or a
+    ConfigParser; pass use_fast=False to read a path through ConfigParser.
     """
+    def parse_list(raw: str) -> list:
+        """
+        config.ini lists are JSON-style (double-quoted), so json.loads handles
+        them; literal_eval is only the fallback for Python-style quoting.
+        """
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return ast.literal_eval(raw)
+
     def build_dict(**kwargs) -> dict:
         auto_book_str = kwargs.get('auto_book_test', 'False')
         auto_book_bool = (auto_book_str.lower() == 'true')
@@ -32,7 +142,7 @@ def parse_config(config: ConfigParser) -> dict:
         # read disabled_dates as a Python list
         raw_disabled = kwargs.get('disabled_dates', '[]')
         try:
-            disabled_list = ast.literal_eval(raw_disabled)
+            disabled_list = parse_list(raw_disabled)
         except:
             disabled_list = []
 
@@ -40,6 +150,7 @@ def parse_config(config: ConfigParser) -> dict:
         formatted_current_test_date_str = kwargs.get('formatted_current_test_date', '').strip()
         before_date_str = kwargs.get('before_date', '').strip()
         after_date_str = kwargs.get('after_date', '').strip()
+        min_date, max_date = date_window(current_test_date_str, before_date_str, after_date_str)
 
         return {
             "licence-id": 0,
@@ -51,14 +162,23 @@ def parse_config(config: ConfigParser) -> dict:
                 "center": kwargs.get('current_test_centre', ''),
                 "error": kwargs.get('current_test_error', '')
             },
-            "disabled-dates": disabled_list,
-            "center": ast.literal_eval(kwargs.get('centre', '[]')),
+            # frozenset: the calendar scan tests every day against it.
+            "disabled-dates": frozenset(disabled_list),
+            "center": tuple(parse_list(kwargs.get('centre', '[]'))),
             "before-date": before_date_str,
             "after-date": after_date_str,
+            "min-date": min_date,
+            "max-date": max_date,
             "auto_book_test": auto_book_bool,
             "formatted_current_test_date": formatted_current_test_date_str,
         }
 
+    if isinstance(config, str):
+        if use_fast:
+            return build_dict(**fast_parse_ini(config))
+        path, config = config, ConfigParser()
+        config.read(path)
+
     key_dict = {}
     for section in config.sections():
         for k, v in config.items(section):
@@ -78,28 +198,83 @@ def random_sleep(base: float, max_extra: float):
     time.sleep(extra)
 
 
+def is_driver_alive(driver: webdriver.Chrome) -> bool:
+    """
+    Returns True if the browser session still answers WebDriver commands.
+    """
+    if driver is None:
+        return False
+    try:
+        driver.current_url
+        return True
+    except WebDriverException:
+        return False
+
+
 def capture_screenshot(driver: webdriver.Chrome, label: str = "error"):
     """
-    Attempts to capture a screenshot with a label + timestamp to './error_screenshots'.
+    Attempts to capture a screenshot with a label + timestamp to SCREENSHOT_DIR.
     """
-    now_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    now_str = datetime.now().isoformat(timespec="seconds").replace(":", "-")
     filename = f"{now_str}_{label}.png"
-    path = os.path.join("error_screenshots", filename)
+    path = os.path.join(SCREENSHOT_DIR, filename)
     try:
+        os.makedirs(SCREENSHOT_DIR, exist_ok=True)
         driver.get_screenshot_as_file(path)
         logger.info("Screenshot captured: %s", path)
-    except WebDriverException as exc:
+    except (WebDriverException, OSError) as exc:
         logger.warning("Could not capture screenshot: %s", exc)
 
 
-def send_text_available(phone_number: str, last_date: str, last_time: str):
+# Twilio long codes take about one message per second, and the same slot can
+# be found on several passes: sends are spaced SMS_MIN_INTERVAL apart and an
+# identical alert is only sent once per SMS_DEDUPE_TTL seconds.
+SMS_MIN_INTERVAL = 1.0
+SMS_DEDUPE_TTL = 600
+_sms_lock = threading.Lock()
+_sms_last_sent = {}
+_sms_next_at = 0.0
+
+
+def _send_sms(key: tuple, phone_number: str, message: str) -> bool:
     """
-    Send a text when a new date/time is available (before final booking).
+    text.send_text() behind the dedupe window and rate limit above. 'key'
+    identifies the alert (kind, centre, date, time). Returns False if it was a
+    duplicate; raises what Twilio raises.
     """
-    message = f"Tests are available on {last_date} at {last_time}."
+    global _sms_next_at
+    with _sms_lock:
+        now = time.monotonic()
+        last = _sms_last_sent.get(key)
+        if last is not None and now - last < SMS_DEDUPE_TTL:
+            logger.info("Skipping duplicate SMS: %s", message)
+            return False
+        # Forget alerts whose dedupe window has passed, so the dict stays small.
+        for old_key in [k for k, t in _sms_last_sent.items() if now - t >= SMS_DEDUPE_TTL]:
+            del _sms_last_sent[old_key]
+        _sms_last_sent[key] = now
+        # Reserve the next send slot, then wait for it outside the lock.
+        send_at = max(now, _sms_next_at)
+        _sms_next_at = send_at + SMS_MIN_INTERVAL
+    time.sleep(max(0.0, send_at - time.monotonic()))
     try:
         text.send_text(phone_number, message)
-        logger.info("SMS sent for availability: %s", message)
+    except Exception:
+        # Let a failed alert be retried.
+        with _sms_lock:
+            _sms_last_sent.pop(key, None)
+        raise
+    return True
+
+
+def send_text_available(phone_number: str, centre: str, last_date: str, last_time: str):
+    """
+    Send a text when a new date/time is available (before final booking).
+    """
+    message = f"Tests are available at {centre} on {last_date} at {last_time}."
+    try:
+        if _send_sms(("available", centre, last_date, last_time), phone_number, message):
+            logger.info("SMS sent for availability: %s", message)
     except Exception as exc:
         logger.warning("Could not send SMS (available test): %s", exc)
 
@@ -111,25 +286,37 @@ def send_text_test_found(phone_number: str, centre: str, date: str, t_time: str,
     short_str = "Short Notice" if short_notice else "Standard"
     message = f"Test found at {centre}!\nDate: {date}, Time: {t_time}, {short_str}."
     try:
-        text.send_text(phone_number, message)
-        logger.info("SMS sent for test found: %s", message)
+        if _send_sms(("found", centre, date, t_time), phone_number, message):
+            logger.info("SMS sent for test found: %s", message)
     except Exception as exc:
         logger.warning("Could not send SMS (test found): %s", exc)
 
 
 def wait_for_internet_connection():
     """
-    Blocks until an internet connection is available.
+    Blocks until an internet connection is available, backing off from 1s
+    to 30s between checks. A bare TCP connect to a public DNS server is the
+    cheap check; networks that block outbound DNS fall back to an HTTPS request.
     """
+    delay = 1.0
     while True:
         try:
-            resp = requests.get("https://www.google.com/", timeout=5)
+            with socket.create_connection(("1.1.1.1", 53), timeout=2):
+                pass
+            logger.info("Connected to the internet.")
+            return
+        except OSError:
+            pass
+        try:
+            resp = _SESSION.get("https://www.google.com/", timeout=5)
             if resp.ok:
                 logger.info("Connected to the internet.")
                 return
-        except Exception:
+        except requests.RequestException:
             pass
-        time.sleep(1)
+        logger.info("No internet connection; retrying in %.0fs.", delay)
+        time.sleep(delay)
+        delay = min(delay * 2, 30.0)
 
 
 def is_time_between(begin_time: dtime, end_time: dtime, check_time=None) -> bool:
@@ -143,48 +330,168 @@ def is_time_between(begin_time: dtime, end_time: dtime, check_time=None) -> bool
     return check_time >= begin_time or check_time <= end_time
 
 
-def input_text_box(driver: webdriver.Chrome, box_id: str, text_to_type: str):
+def sleep_until_open(open_time: dtime, close_time: dtime):
+    """
+    If the current local time is outside open_time..close_time, sleeps in one
+    go until open_time comes round again (today or tomorrow).
+    """
+    now = datetime.now()
+    if is_time_between(open_time, close_time, now.time()):
+        return
+    opens_at = datetime.combine(now.date(), open_time)
+    if opens_at <= now:
+        opens_at += timedelta(days=1)
+    delta = (opens_at - now).total_seconds()
+    logger.info("DVSA is closed; sleeping %ds until it opens at %s.", delta, opens_at)
+    time.sleep(delta)
+
+
+def input_text_box(driver: webdriver.Chrome, box_id: str, text_to_type: str, human_cadence: bool = True):
     """
-    Types text into a text box (with a random delay between keystrokes).
+    Types text into a text box (in a few random-sized bursts, see type_into).
     """
     try:
         box = driver.find_element(By.ID, box_id)
-        for char in text_to_type:
-            box.send_keys(char)
-            time.sleep(random.uniform(0.01, 0.05))
     except NoSuchElementException as exc:
         logger.error("Cannot find text box %s: %s", box_id, exc)
+        return
+    type_into(box, text_to_type, human_cadence)
+
+
+def type_into(box, text_to_type: str, human_cadence: bool = True):
+    """
+    Same as input_text_box, for a text box element the caller already holds
+    (e.g. the one returned by a WebDriverWait), saving a second lookup.
+
+    With human_cadence the text goes in as chunks of 2-5 characters with a
+    short pause between them, so it is not typed instantly but costs a
+    handful of send_keys calls instead of one per character. Without it,
+    the whole text is sent at once.
+    """
+    if not human_cadence:
+        box.send_keys(text_to_type)
+        return
+    i = 0
+    while i < len(text_to_type):
+        if i:
+            time.sleep(random.uniform(0.03, 0.1))
+        step = random.randint(2, 5)
+        box.send_keys(text_to_type[i:i + step])
+        i += step
+
+
+def page_text_contains(driver: webdriver.Chrome, text_to_find: str) -> bool:
+    """
+    Case-insensitive check for 'text_to_find' in the current document's text
+    (see _contains_text). Only a bool comes back over WebDriver instead of
+    the whole page source.
+    """
+    needle = text_to_find.lower()
+    return _contains_text(driver, (needle,))[needle]
+
+
+def _contains_text(driver: webdriver.Chrome, needles: tuple) -> dict:
+    """
+    Case-insensitive check of several lowercase strings against the current
+    document's text in one execute_script. Returns {needle: bool}. Uses textContent, so
+    hidden text counts too, like a page_source check.
+    """
+    found = driver.execute_script(
+        "const text = (document.body ? document.body.textContent : '').toLowerCase();"
+        "return arguments[0].map(n => text.includes(n));",
+        list(needles),
+    )
+    return dict(zip(needles, found))
+
+
+def _page_markers(page_source: str) -> set:
+    """
+    Names of the _PAGE_STATE_MARKERS present in 'page_source'. The source is
+    lowercased once and each marker is a plain substring check, which is far
+    cheaper than a case-insensitive regex alternation over a large page.
+    """
+    page_source = page_source.lower()
+    return {name for name, needle in _PAGE_STATE_MARKERS if needle in page_source}
+
+
+# There is one OS cursor (and one person at the keyboard) for every bot, so
+# captchas are solved one at a time.
+_captcha_lock = threading.Lock()
+
+
+def _bring_to_front(driver: webdriver.Chrome):
+    """
+    Asks Chrome to activate this bot's window (CDP Page.bringToFront) so
+    hardware clicks (and the user) land in it rather than in another bot's.
+    The window manager can still refuse focus (Wayland often does), so this
+    is best effort; the window's rect is re-read and logged for debugging.
+    """
+    try:
+        driver.switch_to.window(driver.current_window_handle)
+        driver.execute_cdp_cmd("Page.bringToFront", {})
+        rect = driver.get_window_rect()
+        logger.debug("Captcha window at x=%(x)s y=%(y)s (%(width)sx%(height)s).", rect)
+    except WebDriverException as exc:
+        logger.warning("Could not bring the browser window to the front: %s", exc)
 
 
 def solve_captcha(
     driver: webdriver.Chrome,
     skip: bool,
     coord_top_right: tuple,
-    coord_bottom_left: tuple
+    coord_bottom_left: tuple,
+    can_click: bool = True
 ) -> bool:
     """
     Attempts to handle the Imperva/hCaptcha. If skip=True, user solves manually.
     Returns True if we think it's solved or not present, False otherwise.
+    Pass can_click=False for a headless browser: nothing can be clicked or
+    shown to the user there, so a captcha that is present counts as unsolved.
+    Clicks and manual solves hold _captcha_lock with the bot's window in front.
     """
+    if skip and not can_click:
+        driver.switch_to.default_content()
+        if _contains_text(driver, (_INCIDENT_ID_TEXT,))[_INCIDENT_ID_TEXT]:
+            logger.warning("Captcha present, but the browser is headless; it cannot be solved manually.")
+            return False
+        return True
+
     if skip:
         logger.info("Manual captcha mode. Please solve hCaptcha manually.")
-        time.sleep(60)
-        return False
+        # Poll (in-browser, twice a second) until the Imperva page is gone,
+        # for at most the 60s we used to sleep outright.
+        driver.switch_to.default_content()
+        with _captcha_lock:
+            _bring_to_front(driver)
+            try:
+                WebDriverWait(driver, 60, poll_frequency=0.5).until(
+                    lambda d: not _contains_text(d, (_INCIDENT_ID_TEXT,))[_INCIDENT_ID_TEXT]
+                )
+            except TimeoutException:
+                return False
+        logger.info("Captcha cleared.")
+        return True
 
     try:
         # Switch to top-level DOM
         driver.switch_to.default_content()
-        page_source = driver.page_source.lower()
+        page_source = driver.page_source
 
         # If we see Imperva text "Request unsuccessful" "incident id", we attempt a click
-        if "request unsuccessful" in page_source and "incident id" in page_source:
+        markers = _page_markers(page_source)
+        if "unsuccessful" in markers and "incident" in markers:
+            if not can_click:
+                logger.warning("Imperva/hCaptcha present, but the browser is headless; not clicking.")
+                return False
             logger.info("Possible Imperva/hCaptcha present, attempting hardware click.")
 
-            hardware_click_range(
-                top_right=coord_top_right,
-                bottom_left=coord_bottom_left
-            )
-            time.sleep(random.uniform(1.5, 2.5))
+            with _captcha_lock:
+                _bring_to_front(driver)
+                hardware_click_range(
+                    top_right=coord_top_right,
+                    bottom_left=coord_bottom_left
+                )
+                time.sleep(random.uniform(1.5, 2.5))
 
         # Return True so we can proceed
         return True
@@ -204,95 +511,99 @@ def check_firewall_and_queue(driver: webdriver.Chrome) -> str:
       - "error" for DVSA "Oops" or unknown
     """
     current_url = driver.current_url.lower()
-    page_source = driver.page_source.lower()
 
     # 1) DVSA Queue
     if "queue.driverpracticaltest.dvsa.gov.uk" in current_url:
         return "queue"
 
+    page_source = driver.page_source
+
+    # Collect every marker present once; the checks below then keep their
+    # original priority order.
+    seen = _page_markers(page_source)
+
     # 2) Imperva Firewall
-    if ("request unsuccessful" in page_source and "incident id" in page_source):
+    if "unsuccessful" in seen and "incident" in seen:
         return "firewall"
 
     # 3) Standard DVSA "login_required" state
-    if "enter details below to access your booking" in page_source:
+    if "login" in seen:
         return "login_required"
 
     # 4) DVSA "Oops" error page
-    if "oops" in page_source:
+    if "oops" in seen:
         return "error"
 
     # 5) Otherwise, we assume it's OK
     return "ok"
 
 
+_CALENDAR_CELLS_JS = """
+const body = document.querySelector('.BookingCalendar-datesBody');
+if (!body) return null;
+return Array.from(body.querySelectorAll('td'), td => {
+    const a = td.querySelector('a');
+    return {cls: td.className || '', date: a ? a.getAttribute('data-date') : null};
+});
+"""
+
+
 def scan_for_preferred_tests(
     driver: webdriver.Chrome,
-    before_date_str: str,
-    after_date_str: str,
+    min_date: datetime,
+    max_date: datetime,
     unavailable_dates: list,
-    current_test_date: str,
     formatted_test_date: str
 ):
     """
     Searches the DVSA calendar for a date that meets:
-      - date < before_date_str (unless 'None')
-      - date > after_date_str (unless 'None')
-      - date not in unavailable_dates
+      - date < min_date and date > max_date (see date_window, computed once
+        at config load)
+      - date not in unavailable_dates (any iterable; a frozenset is used as-is)
       - not the same as your existing test date
       - a weekday (Mon-Fri)
     Returns (found: bool, date_str: str or None, date_element: WebElement or None).
     """
-    def parse_or_default(date_string: str, default: str):
-        """Attempt to parse a date string or return a default date."""
-        if not date_string or date_string == "None":
-            return datetime.strptime(default, "%Y-%m-%d")
-        return datetime.strptime(date_string, "%Y-%m-%d")
+    unavail = (
+        unavailable_dates if isinstance(unavailable_dates, frozenset)
+        else frozenset(unavailable_dates or ())
+    )
 
     try:
-        # If "Yes" in current_test_date, treat that as no real date
-        if current_test_date and "Yes" in current_test_date:
-            min_date = datetime.strptime("2050-12-12", "%Y-%m-%d")
-        else:
-            # E.g. "Wednesday 15 December 2025 2:43PM"
-            try:
-                dt_current_test = datetime.strptime(current_test_date, "%A %d %B %Y %I:%M%p")
-                min_date = dt_current_test - timedelta(days=1)
-            except:
-                min_date = datetime.strptime("2050-12-12", "%Y-%m-%d")
-
-        # If we have an explicit before_date, override
-        if before_date_str and before_date_str != "None":
-            parsed_before = datetime.strptime(before_date_str, "%Y-%m-%d")
-            if parsed_before < min_date:
-                min_date = parsed_before
-
-        max_date = parse_or_default(after_date_str, "2000-01-01")
-
-        cal_body = driver.find_element(By.CLASS_NAME, "BookingCalendar-datesBody")
-        days = cal_body.find_elements(By.XPATH, ".//td")
-
-        if not unavailable_dates:
-            unavailable_dates = []
-
-        for day in days:
-            cls = day.get_attribute("class") or ""
-            if "--unavailable" not in cls:
-                try:
-                    link_el = day.find_element(By.XPATH, ".//a")
-                    link_date_str = link_el.get_attribute("data-date")
-                    link_date_dt = datetime.strptime(link_date_str, "%Y-%m-%d")
-
-                    if (
-                        link_date_str not in unavailable_dates
-                        and link_date_dt < min_date
-                        and link_date_dt > max_date
-                        and link_date_dt.weekday() < 5
-                        and link_date_str != formatted_test_date
-                    ):
-                        return True, link_date_str, link_el
-                except NoSuchElementException:
-                    pass
+        # A cell date is midnight, so "< min_date" means before min_date's day if
+        # it is midnight too, or up to and including that day if it has a time.
+        min_day = min_date.date()
+        if min_date.time() != datetime.min.time():
+            min_day += timedelta(days=1)
+
+        # Class and link date of every day cell in one round trip (null date = no link).
+        cells = driver.execute_script(_CALENDAR_CELLS_JS)
+        if cells is None:
+            raise NoSuchElementException("BookingCalendar-datesBody not found")
+
+        dates = [c["date"] for c in cells if c["date"] and "--unavailable" not in c["cls"]]
+        if not dates:
+            return False, None, None
+
+        # One byte per day of the shown calendar that is also inside the
+        # (max_date, min_date) window: 1 = bookable for us (weekday, not
+        # disabled, not the current test). ISO strings sort like dates.
+        first = max(date.fromisoformat(min(dates)), max_date.date() + timedelta(days=1))
+        end = min(date.fromisoformat(max(dates)) + timedelta(days=1), min_day)
+        allowed = bytearray(max((end - first).days, 0))
+        for i in range(len(allowed)):
+            day = first + timedelta(days=i)
+            iso = day.isoformat()
+            if day.weekday() < 5 and iso not in unavail and iso != formatted_test_date:
+                allowed[i] = 1
+
+        for link_date_str in dates:
+            idx = (date.fromisoformat(link_date_str) - first).days
+            if 0 <= idx < len(allowed) and allowed[idx]:
+                link_el = driver.find_element(
+                    By.CSS_SELECTOR, f".BookingCalendar-datesBody a[data-date='{link_date_str}']"
+                )
+                return True, link_date_str, link_el
         return False, None, None
 
     except NoSuchElementException as exc:
@@ -303,53 +614,84 @@ def scan_for_preferred_tests(
         return False, None, None
 
 
+def _enter_main_iframe(driver: webdriver.Chrome) -> bool:
+    """
+    Switches into Imperva's 'main-iframe' if the page has one (otherwise stays
+    on the top-level document). Returns True if we are now inside it.
+    """
+    driver.switch_to.default_content()
+    try:
+        driver.switch_to.frame(driver.find_element(By.ID, "main-iframe"))
+        return True
+    except NoSuchElementException:
+        return False
+
+
 def book_test_flow(
     driver: webdriver.Chrome,
     short_notice: bool,
     solve_manually: bool,
     coord_top_right: tuple,
     coord_bottom_left: tuple,
-    auto_book_test: bool
+    auto_book_test: bool,
+    headless: bool = False
 ) -> bool:
     """
     Once a test date is selected, attempts to finalize booking.
       1) "I am candidate"
       2) Solve captcha if needed
       3) Confirm changes if auto_book_test = True
+    A headless browser cannot have its captcha clicked, so with headless=True
+    an Imperva page at either step fails the booking instead.
     """
     booking_attempts = 4
     i_am_candidate_clicked = False
     test_taken = False
     success = False
+    # Whether we are inside main-iframe; None once a click/refresh makes it unknown.
+    in_frame = None
+    # Consecutive attempts that ended on the Imperva puzzle (drives the backoff).
+    imperva_streak = 0
 
     for attempt in range(booking_attempts):
         logger.info("Booking attempt %s/%s", attempt + 1, booking_attempts)
-        time.sleep(0.3)
         try:
             if not i_am_candidate_clicked:
-                driver.find_element(By.ID, "i-am-candidate").click()
+                try:
+                    button = WebDriverWait(driver, BOOKING_WAIT_TIMEOUT, poll_frequency=0.05).until(
+                        EC.element_to_be_clickable((By.ID, "i-am-candidate"))
+                    )
+                except TimeoutException:
+                    raise NoSuchElementException("i-am-candidate did not appear")
+                button.click()
                 i_am_candidate_clicked = True
+                in_frame = None
 
-            driver.switch_to.default_content()
-            try:
-                main_frame = driver.find_element(By.ID, "main-iframe")
-                driver.switch_to.frame(main_frame)
-            except NoSuchElementException:
-                # Possibly no main-iframe
-                pass
+            if in_frame is None:
+                in_frame = _enter_main_iframe(driver)
 
-            if "the time chosen is no longer available" in driver.page_source.lower():
+            seen = _contains_text(driver, _BOOKING_PAGE_NEEDLES)
+            if seen[_SLOT_TAKEN_TEXT]:
                 logger.warning("Time chosen is no longer available (taken by someone else).")
                 test_taken = True
                 break
 
-            # Attempt captcha
-            solved = solve_captcha(
-                driver,
-                skip=solve_manually,
-                coord_top_right=coord_top_right,
-                coord_bottom_left=coord_bottom_left
-            )
+            # Attempt captcha. Without an iframe we already know whether the
+            # top-level document (what solve_captcha inspects) shows the Imperva
+            # text, so solve_captcha is only called when it may find something.
+            imperva = seen[_REQUEST_UNSUCCESSFUL_TEXT] and seen[_INCIDENT_ID_TEXT]
+            solved = True
+            if in_frame or imperva:
+                solved = solve_captcha(
+                    driver,
+                    skip=solve_manually,
+                    coord_top_right=coord_top_right,
+                    coord_bottom_left=coord_bottom_left,
+                    can_click=not headless
+                )
+            if not solved and headless:
+                logger.warning("Captcha during booking needs a visible browser. Booking failed.")
+                return False
             if not solved:
                 logger.warning("Captcha not solved successfully.")
             else:
@@ -366,17 +708,18 @@ def book_test_flow(
             logger.warning("Booking attempt error: %s", exc)
 
         # Possibly still on captcha page, try again
-        driver.switch_to.default_content()
         time.sleep(1)
-        try:
-            main_frame = driver.find_element(By.ID, "main-iframe")
-            driver.switch_to.frame(main_frame)
-            if "Why am I seeing this page" in driver.page_source:
-                logger.info("Still behind Imperva puzzle. Will attempt refresh.")
-                random_sleep(20, 4)
-                driver.refresh()
-        except NoSuchElementException:
-            pass
+        in_frame = _enter_main_iframe(driver)
+        if in_frame and _contains_text(driver, _PUZZLE_NEEDLES)[_PUZZLE_TEXT]:
+            # 5s, 10s, 20s... capped at 60s, plus up to 20% jitter.
+            delay = min(5 * 2 ** imperva_streak, 60)
+            imperva_streak += 1
+            logger.info("Still behind Imperva puzzle. Will attempt refresh.")
+            random_sleep(delay, delay * 0.2)
+            driver.refresh()
+            in_frame = None
+        else:
+            imperva_streak = 0
 
     if test_taken:
         logger.warning("Test slot was already taken by someone else.")
@@ -389,11 +732,23 @@ def book_test_flow(
     if auto_book_test:
         logger.info("AUTO_BOOK_TEST is True; clicking 'confirm-changes'.")
         try:
-            driver.find_element(By.ID, "confirm-changes").click()
-            time.sleep(1)
+            try:
+                confirm = WebDriverWait(driver, BOOKING_WAIT_TIMEOUT, poll_frequency=0.05).until(
+                    EC.element_to_be_clickable((By.ID, "confirm-changes"))
+                )
+            except TimeoutException:
+                raise NoSuchElementException("confirm-changes did not appear")
+            confirm.click()
+            try:
+                WebDriverWait(driver, BOOKING_WAIT_TIMEOUT, poll_frequency=0.05).until(EC.staleness_of(confirm))
+            except TimeoutException:
+                pass
 
             page_status = check_firewall_and_queue(driver)
             if page_status == "firewall":
+                if headless:
+                    logger.error("Imperva triggered at final confirm, but the browser is headless. Booking failed.")
+                    return False
                 logger.warning("Imperva triggered at final confirm. Attempting to solve.")
                 random_sleep(40, 4)
                 driver.refresh()
@@ -404,7 +759,7 @@ def book_test_flow(
                         coord_top_right=coord_top_right,
                         coord_bottom_left=coord_bottom_left
                     )
-                    if "imperva" in driver.page_source.lower():
+                    if _IMPERVA_RE.search(driver.page_source):
                         logger.error("Still behind firewall. Booking failed.")
                         return False
             logger.info("Booking confirmation success!")